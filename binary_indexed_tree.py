@@ -1,3 +1,16 @@
+import bisect
+import sys
+from itertools import accumulate
+
+
+def _is_ndarray(a):
+    """
+    numpy 配列かどうか; numpy が import されていなければ numpy 配列は来ないので numpy を読み込まない
+    """
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(a, np.ndarray)
+
+
 class BinaryIndexedTree:
     # http://hos.ac/slides/20140319_bit.pdf
     def __init__(self, size):
@@ -7,6 +20,36 @@ class BinaryIndexedTree:
         self._bit = [0] * size
         self._size = size
 
+    @classmethod
+    def from_values(cls, values):
+        """
+        values で初期化した BIT を O(N) で作る
+        :param list of int values:
+        """
+        bit = cls(len(values))
+        bit._bit = cls._build(values)
+        return bit
+
+    @staticmethod
+    def _build(values):
+        """
+        bit[i - 1] = values[i - lsb(i)] + ... + values[i - 1] を累積和から求める
+        :param values:
+        :rtype: list of int
+        """
+        if _is_ndarray(values):
+            if values.dtype.kind in "iu":
+                import numpy as np
+
+                cs = np.zeros(len(values) + 1, dtype=np.int64)
+                np.cumsum(values, out=cs[1:])
+                i = np.arange(1, len(values) + 1)
+                return (cs[i] - cs[i - (i & -i)]).tolist()
+            # float などは int64 にすると値が変わるのでリストで
+            values = values.tolist()
+        cs = [0, *accumulate(values)]
+        return [cs[i] - cs[i - (i & -i)] for i in range(1, len(values) + 1)]
+
     def add(self, i, w):
         """
         i 番目に w を加える
@@ -37,6 +80,70 @@ class BinaryIndexedTree:
             i -= i & -i
         return ret
 
+    def _use_numpy(self, indices):
+        """
+        O(N) かけて numpy 配列にしても元が取れるくらい件数が多いかどうか
+        :param indices:
+        """
+        return (
+            _is_ndarray(indices) and len(indices) * self._size.bit_length() > self._size
+        )
+
+    def add_many(self, indices, ws):
+        """
+        indices[j] 番目に ws[j] を加える
+        numpy 配列で渡されて件数が多いときは、差分の BIT を作って O(N + K) で足す
+        整数だけのときに限る
+        :param indices:
+        :param ws:
+        """
+        if self._use_numpy(indices):
+            import numpy as np
+
+            ws = np.asarray(ws)
+            bit = np.array(self._bit)
+            if ws.dtype.kind in "iu" and bit.dtype.kind in "iu":
+                delta = np.zeros(self._size, dtype=np.int64)
+                np.add.at(delta, indices, ws)
+                self._bit = (bit + self._build(delta)).tolist()
+                return
+        for i, w in zip(indices, ws):
+            self.add(i, w)
+
+    def sum_many(self, indices):
+        """
+        各 indices[j] について [0, indices[j]) の合計
+        numpy 配列で渡されて件数が多いときは、全部まとめて木を上る
+        整数だけのときに限る
+        :param indices:
+        """
+        if not _is_ndarray(indices):
+            return [self.sum(i) for i in indices]
+        import numpy as np
+
+        bit = np.array(self._bit) if self._use_numpy(indices) else None
+        if bit is None or bit.dtype.kind not in "iu":
+            return np.array([self.sum(i) for i in indices.tolist()])
+        i = np.clip(indices, 0, self._size).astype(np.int64)
+        ret = np.zeros(len(i), dtype=np.int64)
+        while True:
+            m = i > 0
+            if not m.any():
+                break
+            ret[m] += bit[i[m] - 1]
+            i[m] -= i[m] & -i[m]
+        return ret
+
+    def prefix_sums(self):
+        """
+        [sum(0), sum(1), ..., sum(N)] を O(N) で
+        :rtype: list of int
+        """
+        ret = [0] * (self._size + 1)
+        for i in range(1, self._size + 1):
+            ret[i] = self._bit[i - 1] + ret[i - (i & -i)]
+        return ret
+
     def lower_bound(self, w):
         """
         合計が w 以上となるインデックス
@@ -66,6 +173,86 @@ class BinaryIndexedTree:
         return self._size
 
 
+class RangeBinaryIndexedTree:
+    # 区間 Add、区間 Sum
+    # BIT を 2 本持って、[0, i) の合計を bit0.sum(i) + bit1.sum(i) * i で表す
+    # http://hos.ac/slides/20140319_bit.pdf
+    def __init__(self, size):
+        """
+        :param int size:
+        """
+        self._bit0 = [0] * size
+        self._bit1 = [0] * size
+        self._size = size
+
+    def _add(self, i, w0, w1):
+        x = i + 1
+        while x <= self._size:
+            self._bit0[x - 1] += w0
+            self._bit1[x - 1] += w1
+            x += x & -x
+
+    def add(self, l, r, w):
+        """
+        [l, r) に w を加える
+        :param int l:
+        :param int r:
+        :param int w:
+        """
+        self._add(l, -w * l, w)
+        self._add(r, w * r, -w)
+
+    def get(self, i):
+        return self.sum(i + 1) - self.sum(i)
+
+    def sum(self, i, j=None):
+        """
+        [0, i) の合計
+        j を渡したら [i, j) の合計
+        :param int i:
+        :param int|None j:
+        """
+        if j is not None:
+            return self.sum(j) - self.sum(i)
+        if i <= 0:
+            return 0
+        s0 = s1 = 0
+        x = i
+        while x > 0:
+            s0 += self._bit0[x - 1]
+            s1 += self._bit1[x - 1]
+            x -= x & -x
+        return s0 + s1 * i
+
+    def lower_bound(self, w):
+        """
+        合計が w 以上となるインデックス
+        BinaryIndexedTree.lower_bound と同じ
+        ※マイナスの要素がないこと
+        :param w:
+        """
+        if w <= 0:
+            return 0
+        x = 0
+        s0 = s1 = 0
+        length = 1
+        while length < self._size:
+            length <<= 1
+        while length > 0:
+            if x + length - 1 < self._size:
+                t0 = s0 + self._bit0[x + length - 1]
+                t1 = s1 + self._bit1[x + length - 1]
+                # [0, x + length) の合計
+                if t0 + t1 * (x + length) < w:
+                    s0, s1 = t0, t1
+                    x += length
+            length >>= 1
+        return x
+
+    def __len__(self):
+        return self._size
+
+
 class BinaryIndexedTree2D:
     # http://hos.ac/slides/20140319_bit.pdf
     def __init__(self, H, W):
@@ -122,6 +309,69 @@ class BinaryIndexedTree2D:
         return ret
 
 
+class RangeBinaryIndexedTree2D:
+    # 矩形 Add、矩形 Sum
+    # [0, h) x [0, w) の合計を h * w, h, w, 1 の係数の 4 本の BIT で表す
+    def __init__(self, H, W):
+        """
+        :param int H:
+        :param int W:
+        """
+        self._bits = [BinaryIndexedTree2D(H, W) for _ in range(4)]
+        self._H = H
+        self._W = W
+
+    def _add(self, h, w, a):
+        # [h, H) x [w, W) に a を加える
+        # (i, j) での [0, i) x [0, j) の合計には a * (i - h) * (j - w) 増える
+        hw, hh, ww, c = self._bits
+        hw.add(h, w, a)
+        hh.add(h, w, -a * w)
+        ww.add(h, w, -a * h)
+        c.add(h, w, a * h * w)
+
+    def add(self, h1, w1, h2, w2, a):
+        """
+        [h1, h2) x [w1, w2) に a を加える
+        :param int h1:
+        :param int w1:
+        :param int h2:
+        :param int w2:
+        :param int a:
+        """
+        self._add(h1, w1, a)
+        self._add(h1, w2, -a)
+        self._add(h2, w1, -a)
+        self._add(h2, w2, a)
+
+    def get(self, h, w):
+        return self.sum(h, w, h + 1, w + 1)
+
+    def sum(self, h1, w1, h2=None, w2=None):
+        """
+        [0, h1) x [0, w1) の合計
+        h2, w2 を渡したら [h1, h2) x [w1, w2) の合計
+        :param int h1:
+        :param int w1:
+        :param int|None h2:
+        :param int|None w2:
+        """
+        if h2 is not None:
+            return (
+                self.sum(h2, w2)
+                - self.sum(h1, w2)
+                - self.sum(h2, w1)
+                + self.sum(h1, w1)
+            )
+        hw, hh, ww, c = self._bits
+        return (
+            hw.sum(h1, w1) * h1 * w1
+            + hh.sum(h1, w1) * h1
+            + ww.sum(h1, w1) * w1
+            + c.sum(h1, w1)
+        )
+
+
 def compress(li, origin=0):
     """
     座圧
@@ -141,6 +391,106 @@ def compress(li, origin=0):
     return ret, v2i, i2v
 
 
+def compress_np(*arrays, origin=0):
+    """
+    座圧の numpy 版; dict を作らずにソートだけでやる
+    複数渡すと、全部の値をまとめた定義域で座圧する
+    2 次元配列を渡すと、各行をタプルとみなして辞書順で座圧する
+    :param arrays:
+    :param int origin:
+    :return: (codes, uniques); uniques[codes[i] - origin] == a[i]
+        複数渡したときは codes がそれぞれの配列の座圧結果のリスト
+    :rtype: (np.ndarray|list of np.ndarray, np.ndarray)
+    """
+    import numpy as np
+
+    arrays = [np.asarray(a) for a in arrays]
+    values = np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+    if values.ndim == 1:
+        uniques, codes = np.unique(values, return_inverse=True)
+        codes = codes.reshape(-1)
+    else:
+        # 最初の列が第 1 キー
+        order = np.lexsort(values.T[::-1])
+        values = values[order]
+        head = np.ones(len(values), dtype=bool)
+        head[1:] = (values[1:] != values[:-1]).any(axis=1)
+        uniques = values[head]
+        codes = np.empty(len(values), dtype=np.int64)
+        codes[order] = np.cumsum(head) - 1
+    if origin:
+        codes += origin
+    if len(arrays) == 1:
+        return codes, uniques
+    return np.split(codes, np.cumsum([len(a) for a in arrays])[:-1]), uniques
+
+
+class OfflineBinaryIndexedTree2D:
+    # 更新する点を先に全部渡しておく 2 次元 BIT
+    # x で BIT を作り、各ノードにはそのノードに入る点の y のリストとその上の BIT を持つ
+    # メモリ O(N log N)、更新・クエリ O(log^2 N)
+    def __init__(self, points):
+        """
+        :param list of (int, int) points: add するかもしれない (x, y)
+        """
+        points = list(points)
+        xis, _, self._xs = compress([x for x, _ in points])
+        self._size = len(self._xs)
+        ys = [[] for _ in range(self._size)]
+        for xi, (_, y) in zip(xis, points):
+            i = xi + 1
+            while i <= self._size:
+                ys[i - 1].append(y)
+                i += i & -i
+        self._ys = [sorted(set(li)) for li in ys]
+        self._bits = [[0] * len(li) for li in self._ys]
+
+    def add(self, x, y, w):
+        """
+        (x, y) に w を加える
+        (x, y) はコンストラクタで渡した点であること
+        :param int x:
+        :param int y:
+        :param int w:
+        """
+        i = bisect.bisect_left(self._xs, x) + 1
+        while i <= self._size:
+            ys = self._ys[i - 1]
+            bit = self._bits[i - 1]
+            j = bisect.bisect_left(ys, y) + 1
+            while j <= len(bit):
+                bit[j - 1] += w
+                j += j & -j
+            i += i & -i
+
+    def sum(self, x1, y1, x2=None, y2=None):
+        """
+        x < x1 かつ y < y1 の点の合計
+        x2, y2 を渡したら x1 <= x < x2 かつ y1 <= y < y2 の点の合計
+        :param int x1:
+        :param int y1:
+        :param int|None x2:
+        :param int|None y2:
+        """
+        if x2 is not None:
+            return (
+                self.sum(x2, y2)
+                - self.sum(x1, y2)
+                - self.sum(x2, y1)
+                + self.sum(x1, y1)
+            )
+        ret = 0
+        i = bisect.bisect_left(self._xs, x1)
+        while i > 0:
+            bit = self._bits[i - 1]
+            j = bisect.bisect_left(self._ys[i - 1], y1)
+            while j > 0:
+                ret += bit[j - 1]
+                j -= j & -j
+            i -= i & -i
+        return ret
+
+
 def count_inversions(li, compress_values=False):
     """
     リストから転倒数 (li[i] > li[w] (i < w) となる (i, w) の組み合わせ数) を返す
@@ -148,7 +498,7 @@ def count_inversions(li, compress_values=False):
     :rtype: int
     """
     if compress_values:
-        *li, _ = map({v: i for i, v in enumerate(sorted(set(li)))}.__getitem__, li)
+        (*li,) = map({v: i for i, v in enumerate(sorted(set(li)))}.__getitem__, li)
     bit = BinaryIndexedTree(size=max(li) + 1)
     ret = 0
     for i in range(len(li)):
@@ -157,7 +507,263 @@ def count_inversions(li, compress_values=False):
     return ret
 
 
-class OrderedSet:
-    # sortedcontainers か、これ↓を使う
-    # https://github.com/tatyam-prime/SortedSet
-    pass
+def _to_permutation(a, dtype=None):
+    """
+    大小関係を保って 0, 1, ..., N-1 の順列にする
+    同じ値は前にある方を小さくするので、転倒数は変わらない
+    :param dtype: None なら np.int64
+    :rtype: np.ndarray
+    """
+    import numpy as np
+
+    if dtype is None:
+        dtype = np.int64
+    a = np.asarray(a)
+    n = len(a)
+    # もともと順列ならそのまま
+    if (
+        n > 0
+        and np.issubdtype(a.dtype, np.integer)
+        and a.min() == 0
+        and a.max() == n - 1
+        and np.bincount(a).all()
+    ):
+        return a.astype(dtype)
+    ret = np.empty(n, dtype=dtype)
+    ret[np.argsort(a, kind="stable")] = np.arange(n, dtype=dtype)
+    return ret
+
+
+def count_inversions_np(a):
+    """
+    count_inversions の numpy 版
+    上のビットから順に安定に振り分けていく (ビットごとのマージソート) ので O(N log N)、全部ベクトル演算
+    値は dict を使わずに argsort で座圧するので、どんな大きさの値でもいい
+    :param a:
+    :rtype: int
+    """
+    import numpy as np
+
+    n = len(a)
+    size = 1
+    while size < n:
+        size <<= 1
+    dtype = np.int32 if size < 2**31 else np.int64
+    # 2 冪まで大きい値で埋めても転倒数は変わらない
+    seq = np.empty(size, dtype=dtype)
+    seq[:n] = _to_permutation(a, dtype)
+    seq[n:] = np.arange(n, size, dtype=dtype)
+    idx = np.arange(size, dtype=dtype)
+    ret = 0
+    w = size
+    # seq は幅 w のブロックごとに [k * w, (k + 1) * w) の値が元の順番で並んでいる
+    # 各ブロックを値の上位半分と下位半分に安定に振り分けながら、その間の転倒を数える
+    while w > 1:
+        half = w >> 1
+        lower = (seq & half) == 0
+        # 下位半分の値のブロック内の位置の合計 - 0 + 1 + ... + (half - 1)
+        # = 下位半分の値それぞれの前にある上位半分の値の数の合計
+        pos_sum = int(np.compress(lower, idx & (w - 1)).sum(dtype=np.int64))
+        ret += pos_sum - (size // w) * (half * (half - 1) // 2)
+        lowers = np.compress(lower, seq).reshape(-1, half)
+        uppers = np.compress(~lower, seq).reshape(-1, half)
+        seq = np.concatenate([lowers, uppers], axis=1).ravel()
+        w = half
+    return ret
+
+
+def count_range_inversions(li, queries):
+    """
+    各クエリ (l, r) について li[l:r] の転倒数
+    Mo's algorithm と BIT で O((N + Q) √N log N)
+    :param list li:
+    :param list of (int, int) queries:
+    :rtype: list of int
+    """
+    N = len(li)
+    (*p,) = _to_permutation(li).tolist()
+    bit = [0] * N
+
+    def add(i, w):
+        i += 1
+        while i <= N:
+            bit[i - 1] += w
+            i += i & -i
+
+    def less(i):
+        # 区間内で p[i] より小さいものの個数
+        ret = 0
+        while i > 0:
+            ret += bit[i - 1]
+            i -= i & -i
+        return ret
+
+    from libs.mo import mo_order
+
+    order = mo_order(queries, N)
+    ans = [0] * len(queries)
+    l = r = 0
+    inv = 0
+    for qi in order:
+        ql, qr = queries[qi]
+        while r < qr:
+            # 右に追加: 区間内で大きいものの数だけ増える
+            inv += r - l - less(p[r] + 1)
+            add(p[r], 1)
+            r += 1
+        while l > ql:
+            # 左に追加: 区間内で小さいものの数だけ増える
+            l -= 1
+            inv += less(p[l])
+            add(p[l], 1)
+        while r > qr:
+            r -= 1
+            add(p[r], -1)
+            inv -= r - l - less(p[r] + 1)
+        while l < ql:
+            add(p[l], -1)
+            inv -= less(p[l])
+            l += 1
+        ans[qi] = inv
+    return ans
+
+
+if __name__ == "__main__":
+    import random
+
+    import numpy as np
+
+    # Test BinaryIndexedTree.from_values / add_many / sum_many
+    for n in range(1, 40):
+        values = [random.randint(-10, 10) for _ in range(n)]
+        for bit in (
+            BinaryIndexedTree.from_values(values),
+            BinaryIndexedTree.from_values(np.array(values)),
+        ):
+            test = values[:]
+            assert bit.prefix_sums() == [sum(test[:i]) for i in range(n + 1)]
+            for k in (1, n * 2):
+                indices = np.random.randint(0, n, k)
+                ws = np.random.randint(-10, 10, k)
+                bit.add_many(indices, ws)
+                for i, w in zip(indices.tolist(), ws.tolist()):
+                    test[i] += w
+                qs = np.random.randint(0, n + 1, k)
+                assert bit.sum_many(qs).tolist() == [sum(test[:q]) for q in qs]
+                assert bit.sum_many(qs.tolist()) == [sum(test[:q]) for q in qs]
+    # float は int64 に丸めない
+    for n in (1, 5, 40):
+        values = [random.random() for _ in range(n)]
+        bit = BinaryIndexedTree.from_values(np.array(values))
+        indices = np.random.randint(0, n, n * 2)
+        ws = np.random.random(n * 2)
+        bit.add_many(indices, ws)
+        for i, w in zip(indices.tolist(), ws.tolist()):
+            values[i] += w
+        qs = np.arange(n + 1)
+        for got, q in zip(bit.sum_many(qs).tolist(), qs.tolist()):
+            assert abs(got - sum(values[:q])) < 1e-9
+
+    # Test RangeBinaryIndexedTree
+    for n in range(1, 20):
+        bit = RangeBinaryIndexedTree(n)
+        test = [0] * n
+        for _ in range(50):
+            l = random.randint(0, n - 1)
+            r = random.randint(l + 1, n)
+            w = random.randint(0, 10)
+            bit.add(l, r, w)
+            for i in range(l, r):
+                test[i] += w
+            l = random.randint(0, n)
+            r = random.randint(l, n)
+            assert bit.sum(l, r) == sum(test[l:r])
+            assert bit.sum(r) == sum(test[:r])
+            assert bit.get(l % n) == test[l % n]
+            w = random.randint(0, sum(test) + 1)
+            expected = next(
+                (i for i in range(n) if sum(test[: i + 1]) >= w),
+                n,
+            )
+            assert bit.lower_bound(w) == expected
+
+    # Test RangeBinaryIndexedTree2D
+    for _ in range(30):
+        H, W = random.randint(1, 6), random.randint(1, 6)
+        bit = RangeBinaryIndexedTree2D(H, W)
+        test = [[0] * W for _ in range(H)]
+        for _ in range(20):
+            h1, w1 = random.randint(0, H - 1), random.randint(0, W - 1)
+            h2, w2 = random.randint(h1 + 1, H), random.randint(w1 + 1, W)
+            a = random.randint(-10, 10)
+            bit.add(h1, w1, h2, w2, a)
+            for h in range(h1, h2):
+                for w in range(w1, w2):
+                    test[h][w] += a
+            h1, w1 = random.randint(0, H), random.randint(0, W)
+            h2, w2 = random.randint(h1, H), random.randint(w1, W)
+            assert bit.sum(h1, w1, h2, w2) == sum(
+                sum(row[w1:w2]) for row in test[h1:h2]
+            )
+            assert bit.sum(h2, w2) == sum(sum(row[:w2]) for row in test[:h2])
+            h, w = random.randrange(H), random.randrange(W)
+            assert bit.get(h, w) == test[h][w]
+
+    # Test OfflineBinaryIndexedTree2D
+    for _ in range(50):
+        points = [
+            (random.randint(-10, 10), random.randint(-10, 10))
+            for _ in range(random.randint(1, 15))
+        ]
+        bit = OfflineBinaryIndexedTree2D(points)
+        test = {}
+        for _ in range(30):
+            x, y = random.choice(points)
+            w = random.randint(-10, 10)
+            bit.add(x, y, w)
+            test[x, y] = test.get((x, y), 0) + w
+            x1, y1 = random.randint(-11, 11), random.randint(-11, 11)
+            x2, y2 = random.randint(x1, 11), random.randint(y1, 11)
+            assert bit.sum(x1, y1, x2, y2) == sum(
+                v for (x, y), v in test.items() if x1 <= x < x2 and y1 <= y < y2
+            )
+            assert bit.sum(x2, y2) == sum(
+                v for (x, y), v in test.items() if x < x2 and y < y2
+            )
+
+    # Test count_inversions / count_inversions_np / count_range_inversions
+    for n in range(30):
+        li = [random.randint(0, 10) for _ in range(n)]
+        expected = sum(li[i] > li[j] for i in range(n) for j in range(i + 1, n))
+        if n:
+            assert count_inversions(li) == expected
+        assert count_inversions_np(li) == expected
+        perm = np.random.permutation(n)
+        assert count_inversions_np(perm) == sum(
+            perm[i] > perm[j] for i in range(n) for j in range(i + 1, n)
+        )
+        queries = [
+            tuple(sorted((random.randint(0, n), random.randint(0, n))))
+            for _ in range(20)
+        ]
+        assert count_range_inversions(li, queries) == [
+            sum(li[i] > li[j] for i in range(l, r) for j in range(i + 1, r))
+            for l, r in queries
+        ]
+
+    # Test compress_np
+    for _ in range(50):
+        a = np.random.randint(-5, 5, random.randint(1, 20))
+        codes, uniques = compress_np(a, origin=1)
+        assert uniques.tolist() == sorted(set(a.tolist()))
+        assert (uniques[codes - 1] == a).all()
+        b = np.random.randint(-5, 5, random.randint(1, 20))
+        (ca, cb), uniques = compress_np(a, b)
+        assert uniques.tolist() == sorted(set(a.tolist()) | set(b.tolist()))
+        assert (uniques[ca] == a).all() and (uniques[cb] == b).all()
+        pairs = np.random.randint(0, 3, (random.randint(1, 20), 2))
+        codes, uniques = compress_np(pairs)
+        assert [tuple(r) for r in uniques.tolist()] == sorted(
+            set(map(tuple, pairs.tolist()))
+        )
+        assert (uniques[codes] == pairs).all()
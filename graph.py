@@ -1,19 +1,240 @@
 import heapq
+import numbers
+import sys
+from array import array
+from collections import deque
+from itertools import accumulate
+
+
+class CSRGraph:
+    """
+    CSR (Compressed Sparse Row) 形式のグラフ
+    v から出る辺は targets[offsets[v]:offsets[v + 1]]、重みは weights の同じ範囲
+    リストのリストより省メモリで、辺の配列から O(V + E) で作れる
+    offsets, targets は array('q')
+    weights は重みが全部 int64 に収まる int なら array('q')、全部 float なら array('d')、
+    それ以外 (Fraction や 2^63 以上の int など) はそのままのリスト
+    """
+
+    def __init__(self, n, us, vs, ws=None, directed=True):
+        """
+        counting sort で辺を始点ごとにまとめる; 同じ始点の辺は渡した順
+        numpy 配列で渡したら numpy で並べ替える
+        :param int n: 頂点数
+        :param us: 辺の始点
+        :param vs: 辺の終点
+        :param ws: 辺の重み; None なら重みなし
+        :param bool directed: False なら逆向きの辺も追加する
+        """
+        self.n = n
+        self._reverse = None
+        if _is_ndarray(us):
+            self._build_np(n, us, vs, ws, directed)
+        else:
+            self._build(n, us, vs, ws, directed)
+
+    def _build(self, n, us, vs, ws, directed):
+        us = array("q", us)
+        vs = array("q", vs)
+        if not directed:
+            us, vs = us + vs, vs + us
+            if ws is not None:
+                ws = list(ws) * 2
+        m = len(us)
+        counts = [0] * (n + 1)
+        for u in us:
+            counts[u + 1] += 1
+        self.offsets = array("q", accumulate(counts))
+        # 次に書き込む位置
+        pos = self.offsets[:-1]
+        targets = array("q", bytes(8 * m))
+        if ws is None:
+            for u, v in zip(us, vs):
+                targets[pos[u]] = v
+                pos[u] += 1
+            self.weights = None
+        else:
+            ws = list(ws)
+            if all(type(w) is int for w in ws) and (
+                not ws or -(1 << 63) <= min(ws) and max(ws) < 1 << 63
+            ):
+                weights = array("q", bytes(8 * m))
+            elif all(type(w) is float for w in ws):
+                weights = array("d", bytes(8 * m))
+            else:
+                # array に入らない値は変えずにリストで持つ
+                weights = [None] * m
+            for u, v, w in zip(us, vs, ws):
+                i = pos[u]
+                targets[i] = v
+                weights[i] = w
+                pos[u] = i + 1
+            self.weights = weights
+        self.targets = targets
+
+    def _build_np(self, n, us, vs, ws, directed):
+        import numpy as np
+
+        us = np.asarray(us)
+        vs = np.asarray(vs)
+        if ws is not None:
+            ws = np.asarray(ws)
+        if not directed:
+            us, vs = np.concatenate([us, vs]), np.concatenate([vs, us])
+            if ws is not None:
+                ws = np.concatenate([ws, ws])
+        order = np.argsort(us, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(us, minlength=n), out=offsets[1:])
+        self.offsets = array("q", offsets.tobytes())
+        self.targets = array("q", vs[order].astype(np.int64).tobytes())
+        if ws is None:
+            self.weights = None
+        elif np.issubdtype(ws.dtype, np.integer):
+            self.weights = array("q", ws[order].astype(np.int64).tobytes())
+        elif np.issubdtype(ws.dtype, np.floating):
+            self.weights = array("d", ws[order].astype(np.float64).tobytes())
+        else:
+            self.weights = ws[order].tolist()
+
+    @classmethod
+    def from_adjacency(cls, graph):
+        """
+        隣接リストから作る
+        :param list of (list of int) | list of (list of (int, int)) graph:
+            graph[v]: 終点のリストか (終点, 重み) のリスト; (終点, 重み) は tuple でも list でもいい
+        :rtype: CSRGraph
+        """
+        n = len(graph)
+        us = [v for v in range(n) for _ in graph[v]]
+        if any(not isinstance(e, numbers.Integral) for es in graph for e in es):
+            vs = [u for es in graph for u, _ in es]
+            ws = [w for es in graph for _, w in es]
+        else:
+            vs = [u for es in graph for u in es]
+            ws = None
+        return cls(n, us, vs, ws)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, v):
+        """
+        隣接リストと同じ形式で v から出る辺
+        ループの中で使うなら offsets と targets を直接見たほうが速い
+        :param int v:
+        """
+        l, r = self.offsets[v], self.offsets[v + 1]
+        if self.weights is None:
+            return self.targets[l:r]
+        return list(zip(self.targets[l:r], self.weights[l:r]))
+
+    def __iter__(self):
+        for v in range(self.n):
+            yield self[v]
+
+    def neighbors(self, v):
+        """
+        v から出る辺の終点; 重みがあっても終点だけ
+        :param int v:
+        :rtype: array
+        """
+        return self.targets[self.offsets[v] : self.offsets[v + 1]]
+
+    def degree(self, v):
+        """
+        v の出次数
+        :param int v:
+        """
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def sources(self):
+        """
+        各辺の始点
+        :rtype: array
+        """
+        off = self.offsets
+        ret = array("q")
+        for v in range(self.n):
+            ret.extend([v] * (off[v + 1] - off[v]))
+        return ret
+
+    def reverse(self):
+        """
+        すべての辺を逆向きにしたグラフ
+        1 回目に作って使い回す
+        :rtype: CSRGraph
+        """
+        if self._reverse is None:
+            self._reverse = CSRGraph(self.n, self.targets, self.sources(), self.weights)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def to_numpy(self):
+        """
+        (offsets, targets, weights) を numpy 配列で; weights がリストのとき以外はコピーしない
+        :rtype: (np.ndarray, np.ndarray, np.ndarray)
+        """
+        import numpy as np
+
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        targets = np.frombuffer(self.targets, dtype=np.int64)
+        weights = None
+        if isinstance(self.weights, list):
+            weights = np.array(self.weights)
+        elif self.weights is not None:
+            weights = np.frombuffer(
+                self.weights,
+                dtype=np.int64 if self.weights.typecode == "q" else np.float64,
+            )
+        return offsets, targets, weights
+
+
+def _is_ndarray(a):
+    """
+    numpy 配列かどうか; numpy が import されていなければ numpy 配列は来ないので numpy を読み込まない
+    """
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(a, np.ndarray)
+
+
+def _starts(start):
+    """
+    始点を 1 つか複数で受け取ってリストにする
+    :param int | collections.Iterable start:
+    :rtype: list of int
+    """
+    if isinstance(start, numbers.Integral):
+        return [int(start)]
+    return [int(s) for s in start]
+
+
+def _edges_fn(graph):
+    """
+    v から出る (終点, 重み) を返す関数
+    :param list of (list of (int, int)) | CSRGraph graph:
+    """
+    if not isinstance(graph, CSRGraph):
+        return graph.__getitem__
+    off = graph.offsets
+    tg = graph.targets
+    wt = graph.weights or array("q", [1]) * len(tg)
+    return lambda v: zip(tg[off[v] : off[v + 1]], wt[off[v] : off[v + 1]])
 
 
 def bellman_ford(graph, from_v, to_v):
     """
     到達できないなら INF、負閉路があったら -INF
-    :param list of (list of (int, int)) graph: (to, cap) の隣接リスト
+    :param list of (list of (int, int)) | CSRGraph graph: (to, cap) の隣接リスト
     :param int from_v:
     :param int to_v:
     :rtype: int
     """
 
-    def reachable(graph, from_v):
+    def reachable(edges, from_v):
         """
-        graph 上で from_v から到達できるかどうかのリスト
-        :param graph:
+        from_v から到達できるかどうかのリスト
+        :param edges: v から出る (終点, 重み) を返す関数
         :param from_v:
         """
         ret = [False] * len(graph)
@@ -21,20 +242,28 @@ def bellman_ford(graph, from_v, to_v):
         stack = [from_v]
         while stack:
             v = stack.pop()
-            for u, _ in graph[v]:
+            for u, _ in edges(v):
                 if not ret[u]:
                     ret[u] = True
                     stack.append(u)
         return ret
 
+    edges = _edges_fn(graph)
+    if isinstance(graph, CSRGraph):
+        rev_edges = _edges_fn(graph.reverse())
+    else:
+        revs = [[] for _ in range(len(graph))]
+        for v, ud in enumerate(graph):
+            for u, d in ud:
+                revs[u].append((v, d))
+        rev_edges = revs.__getitem__
+
     # from_v から到達でき、かつ to_v へ到達できる頂点のみ考える
     # これら以外には負閉路があっても関係ない
     vertices = []
-    revs = [[] for _ in range(len(graph))]
-    for v, ud in enumerate(graph):
-        for u, d in ud:
-            revs[u].append((v, d))
-    for v, (r1, r2) in enumerate(zip(reachable(graph, from_v), reachable(revs, to_v))):
+    for v, (r1, r2) in enumerate(
+        zip(reachable(edges, from_v), reachable(rev_edges, to_v))
+    ):
         if r1 & r2:
             vertices.append(v)
 
@@ -44,7 +273,7 @@ def bellman_ford(graph, from_v, to_v):
     for _ in range(len(graph) + 1):
         updated = False
         for v in vertices:
-            for u, d in graph[v]:
+            for u, d in edges(v):
                 if dist[v] + d < dist[u]:
                     dist[u] = dist[v] + d
                     updated = True
@@ -53,30 +282,636 @@ def bellman_ford(graph, from_v, to_v):
     return -float("inf") if updated else dist[to_v]
 
 
-def dijkstra(graph, start):
+def spfa(graph, start):
+    """
+    キューを使う Bellman-Ford (SPFA)
+    距離が更新された頂点だけキューに積むので、負閉路がなければだいたい速い; 最悪 O(VE)
+    経路の辺数が N 以上になった頂点は負閉路から到達できるので、そこから先は -INF にする
+    :param list of (list of (int, int)) | CSRGraph graph:
+        graph[from_index]: (to_index, weight)
+    :param int | collections.Iterable start: 始点; 複数渡したら一番近い始点からの距離
+    :return: 距離のリスト; 到達できなければ inf、負閉路の影響を受けるなら -inf
+    :rtype: list
+    """
+    N = len(graph)
+    starts = _starts(start)
+    edges = _edges_fn(graph)
+    INF = float("inf")
+    dist = [INF] * N
+    # 始点からの経路の辺数
+    cnt = [0] * N
+    in_que = [False] * N
+    # 負閉路から到達できる頂点
+    bad = []
+    for s in starts:
+        dist[s] = 0
+        in_que[s] = True
+    que = deque(set(starts))
+    while que:
+        v = que.popleft()
+        in_que[v] = False
+        if cnt[v] >= N:
+            bad.append(v)
+            continue
+        d = dist[v]
+        for u, w in edges(v):
+            if d + w < dist[u]:
+                dist[u] = d + w
+                cnt[u] = cnt[v] + 1
+                if not in_que[u]:
+                    in_que[u] = True
+                    que.append(u)
+
+    # bad から到達できる頂点は全部 -INF
+    stack = bad
+    for v in stack:
+        dist[v] = -INF
+    while stack:
+        v = stack.pop()
+        for u, _ in edges(v):
+            if dist[u] != -INF:
+                dist[u] = -INF
+                stack.append(u)
+    return dist
+
+
+def find_negative_cycle(graph):
+    """
+    負閉路を 1 つ探す; 始点に関係なくグラフ全体から
+    全頂点の距離を 0 にして SPFA をして、経路の辺数が N に達したら prev を N 回たどる
+    prev でできる閉路は必ず負閉路
+    :param list of (list of (int, int)) | CSRGraph graph:
+        graph[from_index]: (to_index, weight)
+    :return: 負閉路の頂点を辺の向きの順に並べたリスト。なければ None
+    :rtype: list of int | None
+    """
+    N = len(graph)
+    edges = _edges_fn(graph)
+    dist = [0] * N
+    cnt = [0] * N
+    prev = [-1] * N
+    in_que = [True] * N
+    que = deque(range(N))
+    while que:
+        v = que.popleft()
+        in_que[v] = False
+        d = dist[v]
+        for u, w in edges(v):
+            if d + w < dist[u]:
+                dist[u] = d + w
+                prev[u] = v
+                cnt[u] = cnt[v] + 1
+                if cnt[u] >= N:
+                    # 閉路の上に行く
+                    for _ in range(N):
+                        u = prev[u]
+                    cycle = [u]
+                    v = prev[u]
+                    while v != u:
+                        cycle.append(v)
+                        v = prev[v]
+                    cycle.reverse()
+                    return cycle
+                if not in_que[u]:
+                    in_que[u] = True
+                    que.append(u)
+    return None
+
+
+def bellman_ford_np(N, us, vs, ws, start):
+    """
+    辺の配列で持つ Bellman-Ford
+    1 ラウンドで全部の辺の緩和を np.minimum.at でまとめてやる; 更新がなくなったら打ち切り
+    N - 1 ラウンドのあとにまだ更新される頂点と、そこから到達できる頂点は -inf
+    :param int N: 頂点数
+    :param np.ndarray us: 辺の始点
+    :param np.ndarray vs: 辺の終点
+    :param np.ndarray ws: 辺の重み
+    :param int | collections.Iterable start: 始点; 複数渡したら一番近い始点からの距離
+    :return: 距離の配列 (float64); 到達できなければ inf、負閉路の影響を受けるなら -inf
+    :rtype: np.ndarray
+    """
+    import numpy as np
+
+    us = np.asarray(us, dtype=np.int64)
+    vs = np.asarray(vs, dtype=np.int64)
+    ws = np.asarray(ws)
+    is_int = np.issubdtype(ws.dtype, np.integer)
+    # 整数なら int64 のまま計算して最後に float にする
+    INF = np.iinfo(np.int64).max // 2 if is_int else np.inf
+    ws = ws.astype(np.int64 if is_int else np.float64)
+    dist = np.full(N, INF, dtype=ws.dtype)
+    dist[_starts(start)] = 0
+
+    def relax(dist):
+        du = dist[us]
+        cand = np.where(du < INF, du + ws, INF)
+        nxt = dist.copy()
+        np.minimum.at(nxt, vs, cand)
+        return nxt
+
+    for _ in range(N):
+        nxt = relax(dist)
+        if np.array_equal(nxt, dist):
+            break
+        dist = nxt
+    else:
+        # N ラウンド目でも更新された; 負閉路の影響を受ける頂点を求める
+        neg = relax(dist) < dist
+        while True:
+            nxt = neg.copy()
+            nxt[vs[neg[us]]] = True
+            if np.array_equal(nxt, neg):
+                break
+            neg = nxt
+        ret = dist.astype(np.float64)
+        ret[dist >= INF] = np.inf
+        ret[neg] = -np.inf
+        return ret
+    ret = dist.astype(np.float64)
+    ret[dist >= INF] = np.inf
+    return ret
+
+
+def _dijkstra_init(graph, start, targets, with_prev):
+    """
+    dijkstra と dijkstra_radix_heap の共通部分
+    :return: (starts, dist, 目的地かどうか, 残りの目的地の数, prev)
+    """
+    N = len(graph)
+    starts = _starts(start)
+    dist = [float("inf")] * N
+    for s in starts:
+        dist[s] = 0
+    is_target = None
+    remaining = 0
+    if targets is not None:
+        is_target = [False] * N
+        for t in targets:
+            if not is_target[t]:
+                is_target[t] = True
+                remaining += 1
+    prev = [-1] * N if with_prev else None
+    return starts, dist, is_target, remaining, prev
+
+
+def dijkstra(graph, start, targets=None, with_prev=False, int_weights=None):
     """
     scipy.sparse.csgraph.dijkstra は内部で使われてるフィボナッチヒープが一部のケースでめっちゃ遅いのであんまり使わないほうがよさげ
     https://atcoder.jp/contests/soundhound2018-summer-qual/submissions/5311823
-    :param list of (list of (int, int)) graph:
+    重みが整数なら (距離 * N + 頂点) の int 1 つをヒープに入れる; tuple を作らない
+    targets を渡したら、その頂点の距離が全部確定した時点で打ち切る; それ以外の頂点の距離は不正確
+    :param list of (list of (int, int)) | CSRGraph graph:
         graph[from_index]: (to_index, weight)
-    :param int start:
+    :param int | collections.Iterable start: 始点; 複数渡したら一番近い始点からの距離
+    :param collections.Iterable targets: 目的地
+    :param bool with_prev: 最短路木での親も返すかどうか
+    :param bool|None int_weights: 重みが全部 int かどうか
+        None なら、重みが array('q') か重みなしの CSRGraph のときだけ True とみなす (隣接リストは見ない)
+    :return: 距離のリスト; 到達できなければ inf。with_prev なら (dist, prev); 始点と到達できない頂点の prev は -1
     """
-    dist = [float("inf") for _ in range(len(graph))]
-    dist[start] = 0
-    heap = []
-    heapq.heappush(heap, (0, start))
+    N = len(graph)
+    starts, dist, is_target, remaining, prev = _dijkstra_init(
+        graph, start, targets, with_prev
+    )
+    edges = _edges_fn(graph)
+    if int_weights is None:
+        int_weights = isinstance(graph, CSRGraph) and (
+            graph.weights is None or getattr(graph.weights, "typecode", None) == "q"
+        )
 
-    while len(heap) > 0:
-        w, v = heapq.heappop(heap)
+    if int_weights:
+        heap = starts[:]
+    else:
+        heap = [(0, s) for s in starts]
+    heapq.heapify(heap)
+    while heap:
+        if int_weights:
+            k = heapq.heappop(heap)
+            w = k // N
+            v = k - w * N
+        else:
+            w, v = heapq.heappop(heap)
         if w > dist[v]:
             continue
-        for u, dw in graph[v]:
-            if w + dw < dist[u]:
-                dist[u] = w + dw
-                heapq.heappush(heap, (w + dw, u))
+        if is_target is not None and is_target[v]:
+            is_target[v] = False
+            remaining -= 1
+            if remaining == 0:
+                break
+        for u, dw in edges(v):
+            nw = w + dw
+            if nw < dist[u]:
+                dist[u] = nw
+                if prev is not None:
+                    prev[u] = v
+                heapq.heappush(heap, nw * N + u if int_weights else (nw, u))
+    if with_prev:
+        return dist, prev
     return dist
 
 
+def dijkstra_radix_heap(graph, start, targets=None, with_prev=False):
+    """
+    Radix Heap を使った dijkstra
+    重みは非負整数のみ。取り出す値が単調増加なことを使って、
+    (値 xor 最後に取り出した値) のビット長ごとのバケットに入れる
+    引数と返り値は dijkstra と同じ
+    :param list of (list of (int, int)) | CSRGraph graph:
+    :param int | collections.Iterable start:
+    :param collections.Iterable targets:
+    :param bool with_prev:
+    """
+    N = len(graph)
+    starts, dist, is_target, remaining, prev = _dijkstra_init(
+        graph, start, targets, with_prev
+    )
+    if (
+        isinstance(graph, CSRGraph)
+        and graph.weights is not None
+        and getattr(graph.weights, "typecode", None) != "q"
+    ):
+        raise ValueError("重みが整数ではありません")
+    edges = _edges_fn(graph)
+
+    # バケットには (距離 * N + 頂点) を入れる; 足りなければ増やす
+    buckets = [[] for _ in range(65)]
+    buckets[0].extend(starts)
+    size = len(starts)
+    last = 0
+    while size:
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            buckets[i] = []
+            last = min(bucket) // N
+            for k in bucket:
+                buckets[((k // N) ^ last).bit_length()].append(k)
+        k = buckets[0].pop()
+        size -= 1
+        v = k - last * N
+        if last > dist[v]:
+            continue
+        if is_target is not None and is_target[v]:
+            is_target[v] = False
+            remaining -= 1
+            if remaining == 0:
+                break
+        for u, dw in edges(v):
+            nw = last + dw
+            if nw < dist[u]:
+                if type(nw) is not int or nw < last:
+                    raise ValueError("重みが非負整数ではありません")
+                dist[u] = nw
+                if prev is not None:
+                    prev[u] = v
+                b = (nw ^ last).bit_length()
+                while b >= len(buckets):
+                    buckets.append([])
+                buckets[b].append(nw * N + u)
+                size += 1
+    if with_prev:
+        return dist, prev
+    return dist
+
+
+def restore_path(prev, t):
+    """
+    dijkstra の prev から t までの最短路を復元する
+    :param list of int prev:
+    :param int t:
+    :return: 始点から t までの頂点のリスト
+    :rtype: list of int
+    """
+    path = [t]
+    while prev[t] >= 0:
+        t = prev[t]
+        path.append(t)
+    path.reverse()
+    return path
+
+
+def bfs01(graph, start):
+    """
+    0-1 BFS; 重みが 0 か 1 のときの最短距離
+    重み 0 の辺は deque の先頭、1 の辺は末尾に積む
+    O(V + E)
+    :param list of (list of (int, int)) | CSRGraph graph:
+        graph[from_index]: (to_index, weight)
+    :param int | collections.Iterable start: 始点; 複数渡したら一番近い始点からの距離
+    :return: 距離のリスト; 到達できなければ inf
+    """
+    N = len(graph)
+    starts = _starts(start)
+    edges = _edges_fn(graph)
+    INF = N + 1
+    dist = [INF] * N
+    done = [False] * N
+    for s in starts:
+        dist[s] = 0
+    que = deque(starts)
+    while que:
+        v = que.popleft()
+        if done[v]:
+            continue
+        done[v] = True
+        d = dist[v]
+        for u, w in edges(v):
+            if d + w < dist[u]:
+                dist[u] = d + w
+                if w:
+                    que.append(u)
+                else:
+                    que.appendleft(u)
+    return [d if d < INF else float("inf") for d in dist]
+
+
+def dial(graph, start, max_weight=None):
+    """
+    Dial のアルゴリズム; 重みが 0 以上 C 以下の整数のときの最短距離
+    距離 mod (C + 1) ごとのバケットを順番に見る
+    O(V * C + E)
+    :param list of (list of (int, int)) | CSRGraph graph:
+        graph[from_index]: (to_index, weight)
+    :param int | collections.Iterable start: 始点; 複数渡したら一番近い始点からの距離
+    :param int max_weight: C; None なら重みの最大値
+    :return: 距離のリスト; 到達できなければ inf
+    """
+    N = len(graph)
+    starts = _starts(start)
+    edges = _edges_fn(graph)
+    if max_weight is None:
+        if isinstance(graph, CSRGraph):
+            max_weight = max(graph.weights or [1], default=0)
+        else:
+            max_weight = max((w for es in graph for _, w in es), default=0)
+    B = max_weight + 1
+    INF = N * B + 1
+    dist = [INF] * N
+    buckets = [[] for _ in range(B)]
+    for s in starts:
+        dist[s] = 0
+        buckets[0].append(s)
+    size = len(starts)
+    d = 0
+    while size:
+        bucket = buckets[d % B]
+        while not bucket:
+            d += 1
+            bucket = buckets[d % B]
+        v = bucket.pop()
+        size -= 1
+        if dist[v] != d:
+            continue
+        for u, w in edges(v):
+            if d + w < dist[u]:
+                dist[u] = d + w
+                buckets[(d + w) % B].append(u)
+                size += 1
+    return [d if d < INF else float("inf") for d in dist]
+
+
+def _pad_grid(costs, H, W, start):
+    """
+    周りを壁 (-1) で囲んだ (H + 2) * (W + 2) の配列にする
+    :return: (囲んだ配列, 囲んだ配列での始点のリスト)
+    """
+    W2 = W + 2
+    padded = [-1] * (W2 * (H + 2))
+    for h in range(H):
+        padded[(h + 1) * W2 + 1 : (h + 1) * W2 + 1 + W] = costs[h * W : (h + 1) * W]
+    starts = _starts(start)
+    starts = [(s // W + 1) * W2 + s % W + 1 for s in starts]
+    return padded, starts
+
+
+def _unpad_grid(dist, H, W, INF):
+    W2 = W + 2
+    ret = []
+    for h in range(H):
+        ret.extend(dist[(h + 1) * W2 + 1 : (h + 1) * W2 + 1 + W])
+    return [d if d < INF else float("inf") for d in ret]
+
+
+def bfs01_grid(costs, H, W, start):
+    """
+    グリッド上の 0-1 BFS; 上下左右に動ける
+    マス i に入るコストが costs[i] (0 か 1)、負のマスは壁
+    :param list of int costs: 長さ H * W; マス (h, w) は h * W + w
+    :param int H:
+    :param int W:
+    :param int | collections.Iterable start: 始点のマスの番号; 複数渡したら一番近い始点からの距離
+    :return: 長さ H * W の距離のリスト; 到達できなければ inf
+    """
+    costs, starts = _pad_grid(costs, H, W, start)
+    W2 = W + 2
+    INF = len(costs) + 1
+    dist = [INF] * len(costs)
+    done = [False] * len(costs)
+    for s in starts:
+        dist[s] = 0
+    que = deque(starts)
+    while que:
+        v = que.popleft()
+        if done[v]:
+            continue
+        done[v] = True
+        d = dist[v]
+        for u in (v - W2, v - 1, v + 1, v + W2):
+            w = costs[u]
+            if w >= 0 and d + w < dist[u]:
+                dist[u] = d + w
+                if w:
+                    que.append(u)
+                else:
+                    que.appendleft(u)
+    return _unpad_grid(dist, H, W, INF)
+
+
+def dial_grid(costs, H, W, start, max_weight=None):
+    """
+    グリッド上の Dial のアルゴリズム; 上下左右に動ける
+    マス i に入るコストが costs[i] (0 以上 C 以下)、負のマスは壁
+    :param list of int costs: 長さ H * W; マス (h, w) は h * W + w
+    :param int H:
+    :param int W:
+    :param int | collections.Iterable start: 始点のマスの番号; 複数渡したら一番近い始点からの距離
+    :param int max_weight: C; None なら costs の最大値
+    :return: 長さ H * W の距離のリスト; 到達できなければ inf
+    """
+    if max_weight is None:
+        max_weight = max(costs, default=0)
+    costs, starts = _pad_grid(costs, H, W, start)
+    W2 = W + 2
+    B = max(max_weight, 0) + 1
+    INF = len(costs) * B + 1
+    dist = [INF] * len(costs)
+    buckets = [[] for _ in range(B)]
+    for s in starts:
+        dist[s] = 0
+        buckets[0].append(s)
+    size = len(starts)
+    d = 0
+    while size:
+        bucket = buckets[d % B]
+        while not bucket:
+            d += 1
+            bucket = buckets[d % B]
+        v = bucket.pop()
+        size -= 1
+        if dist[v] != d:
+            continue
+        for u in (v - W2, v - 1, v + 1, v + W2):
+            w = costs[u]
+            if w >= 0 and d + w < dist[u]:
+                dist[u] = d + w
+                buckets[(d + w) % B].append(u)
+                size += 1
+    return _unpad_grid(dist, H, W, INF)
+
+
+def _floyd_warshall_inf(d, inf):
+    """
+    (辺がないことを表す値, これ以上なら到達できないとみなす値)
+    整数のときは inf 同士や inf と負の値を足すので、inf の半分より大きければ到達できないとする
+    整数の行列に float の inf を渡したら 2^60 を使う
+    """
+    import numpy as np
+
+    if not np.issubdtype(d.dtype, np.integer):
+        return inf, inf if inf == float("inf") else inf / 2
+    if not isinstance(inf, numbers.Integral):
+        if inf != float("inf"):
+            raise ValueError("整数の行列には整数の inf を渡してください")
+        inf = 1 << 60
+    if inf > 1 << 61:
+        raise ValueError("整数の行列の inf は 2^61 以下にしてください")
+    return int(inf), int(inf) // 2
+
+
+def floyd_warshall(d, inf=float("inf"), with_next=False):
+    """
+    ワーシャルフロイド; 全点対間最短路
+    経由する頂点 k ごとに d と d[:, k] + d[k, :] の min をまとめて取る
+    O(N^3); numpy でも N = 1000 だと数秒かかる
+    負閉路があるときは floyd_warshall_negative で影響を受ける組を調べること
+    :param d: N * N の隣接行列 (list か np.ndarray)。辺がなければ inf。int64 か float64 で計算する
+    :param inf: 辺がないことを表す値; 整数なら 2^61 以下で、経路長の絶対値は inf / 2 より十分小さいこと
+        整数の行列で float の inf のままなら 2^60 を使う
+    :param bool with_next: 経路復元用の行列も返すかどうか
+    :return: 距離の行列; 到達できなければ inf (整数の行列で float の inf なら 2^60)。with_next なら (dist, nxt)
+        nxt[i][j]: i から j への最短路で i の次の頂点; 到達できなければ -1
+    :rtype: np.ndarray | (np.ndarray, np.ndarray)
+    """
+    import numpy as np
+
+    d = np.array(d)
+    d = d.astype(np.int64 if np.issubdtype(d.dtype, np.integer) else np.float64)
+    N = len(d)
+    inf, thr = _floyd_warshall_inf(d, inf)
+    np.fill_diagonal(d, np.minimum(np.diag(d), 0))
+    # 負の辺があると負閉路で値が指数的に小さくなってオーバーフローするので、下も抑える
+    # float の thr は inf のことがあるので、2 つ足してもオーバーフローしない有限の値で抑える
+    lower = None
+    if d.min() < 0:
+        lower = -thr if thr < float("inf") else -np.finfo(np.float64).max / 4
+    nxt = None
+    if with_next:
+        nxt = np.where(d < thr, np.arange(N)[None, :], -1)
+        np.fill_diagonal(nxt, np.arange(N))
+    # 毎回確保しないように使い回す
+    cand = np.empty_like(d)
+    better = np.empty(d.shape, dtype=bool)
+    for k in range(N):
+        np.add(d[:, k, None], d[None, k, :], out=cand)
+        if nxt is None:
+            np.minimum(d, cand, out=d)
+        else:
+            np.less(cand, d, out=better)
+            np.copyto(d, cand, where=better)
+            np.copyto(nxt, np.broadcast_to(nxt[:, k, None], nxt.shape), where=better)
+        if lower is not None:
+            np.maximum(d, lower, out=d)
+    unreachable = d >= thr
+    d[unreachable] = inf
+    if with_next:
+        nxt[unreachable] = -1
+        return d, nxt
+    return d
+
+
+def floyd_warshall_negative(d, inf=float("inf")):
+    """
+    floyd_warshall の結果から、負閉路を通っていくらでも短くできる組を求める
+    i から負閉路上の k に行けて、k から j に行けるなら (i, j) はいくらでも短くできる
+    :param np.ndarray d: floyd_warshall の返り値の距離の行列
+    :param inf: floyd_warshall に渡したのと同じ値
+    :return: N * N の bool 行列; どこにも負閉路がなければ全部 False
+    :rtype: np.ndarray
+    """
+    import numpy as np
+
+    inf, thr = _floyd_warshall_inf(d, inf)
+    neg = np.diag(d) < 0
+    to_neg = (d[:, neg] < thr).astype(np.float64)
+    from_neg = (d[neg, :] < thr).astype(np.float64)
+    return to_neg @ from_neg > 0
+
+
+def floyd_warshall_add_edge(d, u, v, w, inf=float("inf"), nxt=None):
+    """
+    floyd_warshall の結果に辺 u -> v (重み w) を追加して in-place で更新する
+    i -> u -> v -> j を通るほうが短ければ更新; O(N^2)
+    追加で負閉路ができる場合は非対応
+    :param np.ndarray d: floyd_warshall の返り値の距離の行列
+    :param int u:
+    :param int v:
+    :param w:
+    :param inf: floyd_warshall に渡したのと同じ値
+    :param np.ndarray nxt: floyd_warshall の返り値の経路復元用の行列; 渡したらこれも更新する
+    :return: 更新があったかどうか
+    :rtype: bool
+    """
+    import numpy as np
+
+    if w >= d[u, v]:
+        return False
+    inf, thr = _floyd_warshall_inf(d, inf)
+    cand = d[:, u, None] + w + d[None, v, :]
+    better = cand < d
+    d[better] = cand[better]
+    if nxt is not None:
+        # i から u までの最短路の次の頂点; u 自身は v へ直接
+        hop = nxt[:, u].copy()
+        hop[u] = v
+        nxt[better] = np.broadcast_to(hop[:, None], d.shape)[better]
+    unreachable = d >= thr
+    d[unreachable] = inf
+    if nxt is not None:
+        nxt[unreachable] = -1
+    return True
+
+
+def floyd_warshall_path(nxt, s, t):
+    """
+    floyd_warshall の nxt から s から t への最短路を復元する
+    :param np.ndarray nxt:
+    :param int s:
+    :param int t:
+    :return: s から t までの頂点のリスト; 到達できなければ None
+    :rtype: list of int | None
+    """
+    if nxt[s, t] < 0:
+        return None
+    path = [s]
+    while s != t:
+        s = int(nxt[s, t])
+        path.append(s)
+    return path
+
+
 def euler_tour(tree, max_v, root=0):
     """
     木のオイラーツアー (通った頂点を順に返す)
@@ -150,13 +985,19 @@ def topological_sort(graph):
     """
     トポロジカルソート
     有効な順序のうち辞書順最小のものを返す
-    :param list of (list of int) graph:
+    :param list of (list of int) | CSRGraph graph: CSRGraph なら重みがあってもいい
     """
     # 入次数
     ins = [0] * len(graph)
-    for vs in graph:
-        for v in vs:
+    if isinstance(graph, CSRGraph):
+        neighbors = graph.neighbors
+        for v in graph.targets:
             ins[v] += 1
+    else:
+        neighbors = graph.__getitem__
+        for vs in graph:
+            for v in vs:
+                ins[v] += 1
 
     # 入次数がゼロのやつ
     zeros = []
@@ -171,7 +1012,7 @@ def topological_sort(graph):
         # zeros の要素ならどれでもいいが辞書順最小になるように heapq を使う
         v = heapq.heappop(zeros)
         ret.append(v)
-        for u in graph[v]:
+        for u in neighbors(v):
             ins[u] -= 1
             if ins[u] == 0:
                 heapq.heappush(zeros, u)
@@ -187,9 +1028,10 @@ def enumerate_bridges(graph):
     橋を列挙する
     http://nupioca.hatenadiary.jp/entry/2013/11/03/200006
     Verify: https://atcoder.jp/contests/abc075/submissions/12488523
-    :param list of (list of int) graph:
+    :param list of (list of int) | CSRGraph graph: 無向グラフ; CSRGraph なら重みがあってもいい
     """
     N = len(graph)
+    neighbors = graph.neighbors if isinstance(graph, CSRGraph) else graph.__getitem__
     ret_bridges = []
     pres = [-1] * N
     lows = [-1] * N
@@ -209,7 +1051,7 @@ def enumerate_bridges(graph):
                 parent, v = v, u
                 order += 1
                 pres[v] = lows[v] = order
-                for u in graph[v]:
+                for u in neighbors(v):
                     if u == parent:
                         continue
                     edges.append((v, u, True))
@@ -229,15 +1071,20 @@ def strongly_connected_components(graph):
     コンポーネント番号はトポロジカル順で前にある方が小さい
     Verify: https://atcoder.jp/contests/arc030/submissions/14035565
     Verify: http://judge.u-aizu.ac.jp/onlinejudge/review.jsp?rid=4553151#1
-    :param list of (list of int) graph:
+    :param list of (list of int) | CSRGraph graph: CSRGraph なら重みがあってもいい
     :rtype: list of int
     """
     N = len(graph)
-
-    rev_graph = [[] for _ in range(N)]
-    for v in range(N):
-        for u in graph[v]:
-            rev_graph[u].append(v)
+    if isinstance(graph, CSRGraph):
+        neighbors = graph.neighbors
+        rev_neighbors = graph.reverse().neighbors
+    else:
+        neighbors = graph.__getitem__
+        rev_graph = [[] for _ in range(N)]
+        for v in range(N):
+            for u in graph[v]:
+                rev_graph[u].append(v)
+        rev_neighbors = rev_graph.__getitem__
 
     # 帰りがけ順
     pre_order = []
@@ -246,17 +1093,16 @@ def strongly_connected_components(graph):
         if seen[v]:
             continue
         seen[v] = True
-        stack = [(v, 0)]
+        stack = [(v, iter(neighbors(v)))]
         while stack:
-            v, pos = stack.pop()
-            for i in range(pos, len(graph[v])):
-                u = graph[v][i]
+            v, it = stack.pop()
+            for u in it:
                 if seen[u]:
                     continue
                 seen[u] = True
-                # 中断して次の頂点を Stack に詰む
-                stack.append((v, i + 1))
-                stack.append((u, 0))
+                # 中断して次の頂点を Stack に詰む; it は続きから読まれる
+                stack.append((v, it))
+                stack.append((u, iter(neighbors(u))))
                 break
             else:
                 # 帰りがけ
@@ -274,10 +1120,316 @@ def strongly_connected_components(graph):
         while stack:
             v = stack.pop()
             ret[v] = cid
-            for u in rev_graph[v]:
+            for u in rev_neighbors(v):
                 if seen[u]:
                     continue
                 seen[u] = True
                 stack.append(u)
         cid += 1
     return ret
+
+
+if __name__ == "__main__":
+    import random
+    from fractions import Fraction
+
+    import numpy as np
+
+    INF = float("inf")
+
+    def random_edges(n, m, lo, hi):
+        return [
+            (random.randrange(n), random.randrange(n), random.randint(lo, hi))
+            for _ in range(m)
+        ]
+
+    def to_adjacency(n, edges):
+        graph = [[] for _ in range(n)]
+        for u, v, w in edges:
+            graph[u].append((v, w))
+        return graph
+
+    def to_csr(n, edges, **kwargs):
+        us = [u for u, _, _ in edges]
+        vs = [v for _, v, _ in edges]
+        ws = [w for _, _, w in edges]
+        return CSRGraph(n, us, vs, ws, **kwargs)
+
+    def shortest_paths(n, edges, starts):
+        """
+        素朴な Bellman-Ford; 負閉路の影響を受ける頂点は -inf
+        """
+        dist = [INF] * n
+        for s in starts:
+            dist[s] = 0
+        for _ in range(n * 2):
+            for u, v, w in edges:
+                if dist[u] + w < dist[v]:
+                    dist[v] = dist[u] + w if _ < n else -INF
+        return dist
+
+    # Test CSRGraph
+    for _ in range(200):
+        n = random.randint(1, 10)
+        edges = random_edges(n, random.randint(0, 20), -5, 10)
+        graph = to_adjacency(n, edges)
+        csr = to_csr(n, edges)
+        assert [csr[v] for v in range(n)] == graph
+        if edges:
+            assert CSRGraph.from_adjacency(graph)[0] == graph[0]
+            # (to, w) が list でも重み付きとみなす
+            lists = [[list(e) for e in es] for es in graph]
+            assert CSRGraph.from_adjacency(lists)[0] == graph[0]
+        us = np.array([u for u, _, _ in edges], dtype=np.int64)
+        vs = np.array([v for _, v, _ in edges], dtype=np.int64)
+        ws = np.array([w for _, _, w in edges], dtype=np.int64)
+        csr_np = CSRGraph(n, us, vs, ws)
+        assert list(csr_np.offsets) == list(csr.offsets)
+        assert list(csr_np.targets) == list(csr.targets)
+        assert list(csr_np.weights) == list(csr.weights)
+        assert sorted(
+            zip(csr.reverse().targets, csr.reverse().sources(), csr.reverse().weights)
+        ) == sorted(edges)
+        undirected = to_csr(n, edges, directed=False)
+        assert sorted(zip(undirected.sources(), undirected.targets)) == sorted(
+            [(u, v) for u, v, _ in edges] + [(v, u) for u, v, _ in edges]
+        )
+        s, t = random.randrange(n), random.randrange(n)
+        expected = shortest_paths(n, edges, [s])[t]
+        assert bellman_ford(graph, s, t) == bellman_ford(csr, s, t)
+        if expected > -INF:
+            assert bellman_ford(csr, s, t) == expected
+        # 強連結成分: 同じ成分 <=> 互いに到達できる
+        reach = [[False] * n for _ in range(n)]
+        for v in range(n):
+            reach[v][v] = True
+        for _ in range(n):
+            for u, v, _ in edges:
+                for x in range(n):
+                    if reach[x][u]:
+                        reach[x][v] = True
+        for g in (graph, csr):
+            scc = strongly_connected_components(
+                [[v for v, _ in es] for es in g] if g is graph else g
+            )
+            for u in range(n):
+                for v in range(n):
+                    assert (scc[u] == scc[v]) == (reach[u][v] and reach[v][u])
+                    if reach[u][v] and not reach[v][u]:
+                        assert scc[u] < scc[v]
+        # トポロジカルソート; 重み付きの CSRGraph でもいい
+        dag = [(u, v, w) for u, v, w in edges if u < v]
+        order = topological_sort(to_csr(n, dag))
+        assert order == topological_sort(
+            [[v for v, _ in es] for es in to_adjacency(n, dag)]
+        )
+        pos = {v: i for i, v in enumerate(order)}
+        assert all(pos[u] < pos[v] for u, v, _ in dag)
+        # 橋
+        simple = list({(min(u, v), max(u, v), 0) for u, v, _ in edges if u != v})
+        adj = [[] for _ in range(n)]
+        for u, v, _ in simple:
+            adj[u].append(v)
+            adj[v].append(u)
+        bridges = {tuple(sorted(e)) for e in enumerate_bridges(adj)}
+        assert bridges == {
+            tuple(sorted(e))
+            for e in enumerate_bridges(to_csr(n, simple, directed=False))
+        }
+        for u, v, _ in simple:
+            # 取り除いたら u から v に行けなくなるか
+            rest = [e for e in simple if e[:2] != (u, v)]
+            seen = {u}
+            stack = [u]
+            while stack:
+                x = stack.pop()
+                for a, b, _ in rest:
+                    for p, q in ((a, b), (b, a)):
+                        if p == x and q not in seen:
+                            seen.add(q)
+                            stack.append(q)
+            assert ((u, v) in bridges) == (v not in seen)
+    # Fraction などは float にしない
+    csr = CSRGraph(3, [0, 1], [1, 2], [Fraction(1, 2), Fraction(1, 3)])
+    assert csr.weights == [Fraction(1, 2), Fraction(1, 3)]
+    assert bellman_ford(csr, 0, 2) == Fraction(5, 6)
+    # int64 に収まらない int もそのまま
+    assert CSRGraph(2, [0], [1], [10**20]).weights == [10**20]
+    assert bellman_ford([[(1, 10**20)], []], 0, 1) == 10**20
+    assert bellman_ford(CSRGraph(2, [0], [1], [10**20]), 0, 1) == 10**20
+
+    # Test dijkstra
+    for _ in range(300):
+        n = random.randint(1, 10)
+        edges = random_edges(n, random.randint(0, 20), 0, 10)
+        graph = to_adjacency(n, edges)
+        starts = random.sample(range(n), random.randint(1, min(3, n)))
+        expected = shortest_paths(n, edges, starts)
+        start = starts if len(starts) > 1 else np.int64(starts[0])
+        for g in (graph, to_csr(n, edges)):
+            for fn in (dijkstra, dijkstra_radix_heap):
+                assert fn(g, start) == expected
+                dist, prev = fn(g, start, with_prev=True)
+                for t in range(n):
+                    if dist[t] == INF:
+                        continue
+                    path = restore_path(prev, t)
+                    assert path[0] in starts and path[-1] == t
+                    weight = {(u, v): w for u, v, w in sorted(edges, reverse=True)}
+                    assert (
+                        sum(weight[path[i], path[i + 1]] for i in range(len(path) - 1))
+                        == dist[t]
+                    )
+                targets = random.sample(range(n), random.randint(1, n))
+                dist = fn(g, start, targets=targets)
+                assert all(dist[t] == expected[t] for t in targets)
+            assert dijkstra(g, start, int_weights=False) == expected
+        # float の重み
+        fedges = [(u, v, w / 4) for u, v, w in edges]
+        expected = shortest_paths(n, fedges, starts)
+        assert dijkstra(to_adjacency(n, fedges), start) == expected
+        assert dijkstra(to_csr(n, fedges), start) == expected
+    for g in ([[(1, 0.5)], []], [[(1, -1)], []], CSRGraph(2, [0], [1], [0.5])):
+        try:
+            dijkstra_radix_heap(g, 0)
+            assert False
+        except ValueError:
+            pass
+
+    # Test bfs01, dial
+    for _ in range(300):
+        n = random.randint(1, 10)
+        C = random.choice((1, 3))
+        edges = random_edges(n, random.randint(0, 20), 0, C)
+        starts = random.sample(range(n), random.randint(1, min(3, n)))
+        expected = shortest_paths(n, edges, starts)
+        start = starts if len(starts) > 1 else np.int64(starts[0])
+        for g in (to_adjacency(n, edges), to_csr(n, edges)):
+            if C == 1:
+                assert bfs01(g, start) == expected
+            assert dial(g, start) == expected
+            assert dial(g, start, max_weight=C + 2) == expected
+    # グリッド
+    for _ in range(300):
+        H = random.randint(1, 6)
+        W = random.randint(1, 6)
+        C = random.choice((1, 3))
+        costs = [random.randint(-1, C) for _ in range(H * W)]
+        edges = []
+        for v in range(H * W):
+            h, w = divmod(v, W)
+            for nh, nw in ((h - 1, w), (h + 1, w), (h, w - 1), (h, w + 1)):
+                if 0 <= nh < H and 0 <= nw < W and costs[nh * W + nw] >= 0:
+                    edges.append((v, nh * W + nw, costs[nh * W + nw]))
+        starts = random.sample(range(H * W), random.randint(1, min(3, H * W)))
+        expected = shortest_paths(H * W, edges, starts)
+        start = starts if len(starts) > 1 else np.int64(starts[0])
+        if C == 1:
+            assert bfs01_grid(costs, H, W, start) == expected
+        assert dial_grid(costs, H, W, start) == expected
+
+    # Test spfa, find_negative_cycle, bellman_ford_np
+    for _ in range(300):
+        n = random.randint(1, 10)
+        edges = random_edges(n, random.randint(0, 20), -3, 10)
+        starts = random.sample(range(n), random.randint(1, min(3, n)))
+        expected = shortest_paths(n, edges, starts)
+        start = starts if len(starts) > 1 else np.int64(starts[0])
+        for g in (to_adjacency(n, edges), to_csr(n, edges)):
+            assert spfa(g, start) == expected
+            cycle = find_negative_cycle(g)
+            if -INF in shortest_paths(n, edges, range(n)):
+                weight = {}
+                for u, v, w in edges:
+                    weight[u, v] = min(weight.get((u, v), INF), w)
+                cycle_edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+                assert sum(weight[e] for e in cycle_edges) < 0
+            else:
+                assert cycle is None
+        us = np.array([u for u, _, _ in edges], dtype=np.int64)
+        vs = np.array([v for _, v, _ in edges], dtype=np.int64)
+        ws = np.array([w for _, _, w in edges], dtype=np.int64)
+        assert bellman_ford_np(n, us, vs, ws, start).tolist() == expected
+        assert bellman_ford_np(n, us, vs, ws / 2, start).tolist() == [
+            d / 2 for d in expected
+        ]
+
+    # Test floyd_warshall
+    dist = floyd_warshall([[0, 3], [1, 0]])
+    assert dist.tolist() == [[0, 3], [1, 0]]
+    assert not floyd_warshall_negative(dist).any()
+    assert floyd_warshall_add_edge(dist, 0, 1, 2)
+    assert dist.tolist() == [[0, 2], [1, 0]]
+    # 整数の行列で inf が float なら 2^60
+    assert floyd_warshall(np.array([[0, 1 << 60], [1, 0]])).tolist() == [
+        [0, 1 << 60],
+        [1, 0],
+    ]
+    for _ in range(300):
+        n = random.randint(1, 8)
+        edges = random_edges(n, random.randint(0, 20), -3, 9)
+        expected = [shortest_paths(n, edges, [s]) for s in range(n)]
+        has_negative = any(-INF in row for row in expected)
+        for inf in (INF, 1 << 60, 10**9):
+            d = [[inf] * n for _ in range(n)]
+            for u, v, w in edges:
+                d[u][v] = min(d[u][v], w if inf != INF else float(w))
+            dist, nxt = floyd_warshall(d, inf=inf, with_next=True)
+            assert (dist == floyd_warshall(d, inf=inf)).all()
+            negative = floyd_warshall_negative(dist, inf=inf)
+            for i in range(n):
+                for j in range(n):
+                    assert negative[i, j] == (expected[i][j] == -INF)
+                    if expected[i][j] == -INF:
+                        continue
+                    assert dist[i, j] == (
+                        inf if expected[i][j] == INF else expected[i][j]
+                    )
+                    path = floyd_warshall_path(nxt, i, j)
+                    if expected[i][j] == INF:
+                        assert path is None
+                        continue
+                    assert path[0] == i and path[-1] == j
+                    assert (
+                        sum(d[path[k]][path[k + 1]] for k in range(len(path) - 1))
+                        == dist[i, j]
+                    )
+            if has_negative:
+                continue
+            # 辺の追加
+            added = edges[:]
+            for _ in range(3):
+                u, v, w = random.randrange(n), random.randrange(n), random.randint(0, 9)
+                added.append((u, v, w))
+                after = [shortest_paths(n, added, [s]) for s in range(n)]
+                if any(-INF in row for row in after):
+                    # 負閉路ができる追加は非対応
+                    break
+                floyd_warshall_add_edge(dist, u, v, w, inf=inf, nxt=nxt)
+                d[u][v] = min(d[u][v], w)
+                for i in range(n):
+                    for j in range(n):
+                        assert dist[i, j] == (
+                            inf if after[i][j] == INF else after[i][j]
+                        )
+                        path = floyd_warshall_path(nxt, i, j)
+                        if path is not None:
+                            assert (
+                                sum(
+                                    d[path[k]][path[k + 1]]
+                                    for k in range(len(path) - 1)
+                                )
+                                == dist[i, j]
+                            )
+    # float の負閉路で値が -inf に発散して inf と足して nan にならない
+    d = np.full((40, 40), -1e300)
+    d[:, 3] = INF
+    dist = floyd_warshall(d)
+    assert not np.isnan(dist).any()
+    # 3 には入れないので (i, 3) 以外は全部いくらでも短くできる
+    assert (floyd_warshall_negative(dist) == (np.arange(40) != 3)[None, :]).all()
+    try:
+        floyd_warshall([[0, 1], [1, 0]], inf=1.5)
+        assert False
+    except ValueError:
+        pass
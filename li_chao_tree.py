@@ -0,0 +1,364 @@
+import bisect
+
+
+class LiChaoTree:
+    """
+    直線・線分を追加して、ある x での min (max) を求める
+    クエリに使う x を先に全部渡しておく
+    追加 O(log N)、線分の追加 O(log^2 N)、クエリ O(log N)
+    https://smijake3.hatenablog.com/entry/2018/06/16/144548
+    """
+
+    def __init__(self, xs, fn=min):
+        """
+        :param list of int xs: クエリに使う x の候補
+        :param callable fn: min か max
+        """
+        if not (fn is min or fn is max):
+            raise NotImplementedError()
+        # max のときは直線を -1 倍して min を求める
+        self._sign = 1 if fn is min else -1
+        self._xs = sorted(set(xs))
+        self._n = len(self._xs)
+        size = 1
+        while size < self._n:
+            size <<= 1
+        self._size = size
+        # 足りない分は最後の x で埋める
+        self._x = self._xs + [self._xs[-1]] * (size - self._n)
+        # 直線がないノードは傾き 0、切片 inf
+        self._a = [0] * size * 2
+        self._b = [float("inf")] * size * 2
+
+    def _add(self, k, a, b):
+        """
+        ノード k 以下に直線 y = ax + b を追加する
+        :param int k:
+        :param int a:
+        :param int b:
+        """
+        X = self._x
+        A = self._a
+        B = self._b
+        depth = k.bit_length() - 1
+        width = self._size >> depth
+        lo = (k - (1 << depth)) * width
+        hi = lo + width
+        while True:
+            mid = (lo + hi) >> 1
+            x = X[mid]
+            # ノードには mid で小さい方を残す
+            if a * x + b < A[k] * x + B[k]:
+                a, A[k] = A[k], a
+                b, B[k] = B[k], b
+            if hi - lo == 1:
+                return
+            x = X[lo]
+            if a * x + b < A[k] * x + B[k]:
+                k <<= 1
+                hi = mid
+                continue
+            x = X[hi - 1]
+            if a * x + b < A[k] * x + B[k]:
+                k = k << 1 | 1
+                lo = mid
+                continue
+            return
+
+    def add_line(self, a, b):
+        """
+        直線 y = ax + b を追加する
+        :param int a:
+        :param int b:
+        """
+        self._add(1, a * self._sign, b * self._sign)
+
+    def add_segment(self, a, b, l, r):
+        """
+        線分 y = ax + b (l <= x < r) を追加する
+        :param int a:
+        :param int b:
+        :param int l:
+        :param int r:
+        """
+        a *= self._sign
+        b *= self._sign
+        l = bisect.bisect_left(self._xs, l) + self._size
+        r = bisect.bisect_left(self._xs, r) + self._size
+        while l < r:
+            if l & 1:
+                self._add(l, a, b)
+                l += 1
+            if r & 1:
+                r -= 1
+                self._add(r, a, b)
+            l >>= 1
+            r >>= 1
+
+    def get(self, x):
+        """
+        x での min (max)
+        直線がないときは inf (-inf)
+        :param int x: xs に含まれる値
+        """
+        A = self._a
+        B = self._b
+        k = bisect.bisect_left(self._xs, x) + self._size
+        ret = float("inf")
+        while k > 0:
+            y = A[k] * x + B[k]
+            ret = min(ret, y)
+            k >>= 1
+        return ret * self._sign
+
+
+class DynamicLiChaoTree:
+    """
+    必要なノードだけ作る Li Chao Tree
+    x が [lo, hi) の整数ならなんでもいい; 座圧できないときに使う
+    ノードは left, right, a, b の配列で持つ
+    追加 O(log (hi - lo))、線分の追加 O(log^2 (hi - lo))、クエリ O(log (hi - lo))
+    """
+
+    def __init__(self, lo, hi, fn=min):
+        """
+        :param int lo:
+        :param int hi:
+        :param callable fn: min か max
+        """
+        if not (fn is min or fn is max):
+            raise NotImplementedError()
+        self._sign = 1 if fn is min else -1
+        self._lo = lo
+        self._hi = hi
+        # -1 は子がいない。0 が root
+        self._left = [-1]
+        self._right = [-1]
+        # 直線がないノードは傾き 0、切片 inf
+        self._a = [0]
+        self._b = [float("inf")]
+
+    def _new_node(self):
+        self._left.append(-1)
+        self._right.append(-1)
+        self._a.append(0)
+        self._b.append(float("inf"))
+        return len(self._a) - 1
+
+    def _add(self, k, lo, hi, a, b):
+        """
+        ノード k ([lo, hi) を担当) 以下に直線 y = ax + b を追加する
+        """
+        A = self._a
+        B = self._b
+        while True:
+            mid = (lo + hi) >> 1
+            # ノードには mid で小さい方を残す
+            if a * mid + b < A[k] * mid + B[k]:
+                a, A[k] = A[k], a
+                b, B[k] = B[k], b
+            if hi - lo == 1:
+                return
+            if a * lo + b < A[k] * lo + B[k]:
+                if self._left[k] < 0:
+                    self._left[k] = self._new_node()
+                k = self._left[k]
+                hi = mid
+                continue
+            if a * (hi - 1) + b < A[k] * (hi - 1) + B[k]:
+                if self._right[k] < 0:
+                    self._right[k] = self._new_node()
+                k = self._right[k]
+                lo = mid
+                continue
+            return
+
+    def add_line(self, a, b):
+        """
+        直線 y = ax + b を追加する
+        :param int a:
+        :param int b:
+        """
+        self._add(0, self._lo, self._hi, a * self._sign, b * self._sign)
+
+    def add_segment(self, a, b, l, r):
+        """
+        線分 y = ax + b (l <= x < r) を追加する
+        :param int a:
+        :param int b:
+        :param int l:
+        :param int r:
+        """
+        a *= self._sign
+        b *= self._sign
+        stack = [(0, self._lo, self._hi)]
+        while stack:
+            k, lo, hi = stack.pop()
+            if r <= lo or hi <= l:
+                continue
+            if l <= lo and hi <= r:
+                self._add(k, lo, hi, a, b)
+                continue
+            mid = (lo + hi) >> 1
+            if l < mid:
+                if self._left[k] < 0:
+                    self._left[k] = self._new_node()
+                stack.append((self._left[k], lo, mid))
+            if mid < r:
+                if self._right[k] < 0:
+                    self._right[k] = self._new_node()
+                stack.append((self._right[k], mid, hi))
+
+    def get(self, x):
+        """
+        x での min (max)
+        直線がないときは inf (-inf)
+        :param int x:
+        """
+        A = self._a
+        B = self._b
+        ret = float("inf")
+        k = 0
+        lo, hi = self._lo, self._hi
+        while k >= 0:
+            y = A[k] * x + B[k]
+            ret = min(ret, y)
+            mid = (lo + hi) >> 1
+            if x < mid:
+                k = self._left[k]
+                hi = mid
+            else:
+                k = self._right[k]
+                lo = mid
+        return ret * self._sign
+
+
+class ConvexHullTrick:
+    """
+    傾きが単調な順に直線を追加する CHT
+    min なら傾きの広義単調減少順、max なら広義単調増加順に追加すること
+    追加はならし O(1)、get は O(log N)
+    クエリの x が広義単調増加なら get_monotone でならし O(1)
+    """
+
+    def __init__(self, fn=min):
+        """
+        :param callable fn: min か max
+        """
+        if not (fn is min or fn is max):
+            raise NotImplementedError()
+        self._sign = 1 if fn is min else -1
+        # 傾きの単調減少順
+        self._a = []
+        self._b = []
+        # get_monotone で不要になった先頭の直線の数
+        self._head = 0
+
+    def _unnecessary(self, a3, b3):
+        # 最後の 2 本を l1, l2 として、l1 と (a3, b3) があれば l2 はいらない
+        a1, b1 = self._a[-2], self._b[-2]
+        a2, b2 = self._a[-1], self._b[-1]
+        # (l1 と l2 の交点) >= (l2 と l3 の交点)
+        return (b2 - b1) * (a2 - a3) >= (b3 - b2) * (a1 - a2)
+
+    def add_line(self, a, b):
+        """
+        直線 y = ax + b を追加する
+        :param int a:
+        :param int b:
+        """
+        a *= self._sign
+        b *= self._sign
+        A = self._a
+        B = self._b
+        if len(A) > self._head and A[-1] == a:
+            if B[-1] <= b:
+                return
+            A.pop()
+            B.pop()
+        while len(A) - self._head >= 2 and self._unnecessary(a, b):
+            A.pop()
+            B.pop()
+        A.append(a)
+        B.append(b)
+
+    def get(self, x):
+        """
+        x での min (max)
+        :param int x:
+        """
+        A = self._a
+        B = self._b
+        # x で直前の直線以下になる最後の直線を探す
+        ok, ng = self._head, len(A)
+        while ng - ok > 1:
+            mid = (ok + ng) >> 1
+            if A[mid] * x + B[mid] <= A[mid - 1] * x + B[mid - 1]:
+                ok = mid
+            else:
+                ng = mid
+        return (A[ok] * x + B[ok]) * self._sign
+
+    def get_monotone(self, x):
+        """
+        x での min (max)
+        前回の get_monotone より x が小さくないこと
+        :param int x:
+        """
+        A = self._a
+        B = self._b
+        h = self._head
+        while h + 1 < len(A) and A[h + 1] * x + B[h + 1] <= A[h] * x + B[h]:
+            h += 1
+        self._head = h
+        return (A[h] * x + B[h]) * self._sign
+
+
+if __name__ == "__main__":
+    import random
+
+    # Test LiChaoTree / DynamicLiChaoTree
+    for fn in (min, max):
+        for _ in range(100):
+            xs = random.sample(range(-20, 20), random.randint(1, 10))
+            lct = LiChaoTree(xs, fn=fn)
+            dlct = DynamicLiChaoTree(-20, 20, fn=fn)
+            # (a, b, l, r)
+            lines = []
+            for _ in range(10):
+                a = random.randint(-5, 5)
+                b = random.randint(-20, 20)
+                if random.random() < 0.5:
+                    lct.add_line(a, b)
+                    dlct.add_line(a, b)
+                    lines.append((a, b, -20, 20))
+                else:
+                    l = random.randint(-20, 19)
+                    r = random.randint(l + 1, 20)
+                    lct.add_segment(a, b, l, r)
+                    dlct.add_segment(a, b, l, r)
+                    lines.append((a, b, l, r))
+                for x in xs:
+                    ys = [a * x + b for a, b, l, r in lines if l <= x < r]
+                    # 直線がないときは inf (-inf)
+                    empty = float("inf") if fn is min else -float("inf")
+                    expected = fn(ys) if ys else empty
+                    assert lct.get(x) == expected
+                    assert dlct.get(x) == expected
+
+    # Test ConvexHullTrick
+    for fn in (min, max):
+        for _ in range(100):
+            cht = ConvexHullTrick(fn=fn)
+            slopes = sorted(
+                (random.randint(-10, 10) for _ in range(10)), reverse=fn is min
+            )
+            lines = []
+            for a in slopes:
+                b = random.randint(-50, 50)
+                cht.add_line(a, b)
+                lines.append((a, b))
+                for x in range(-20, 20):
+                    assert cht.get(x) == fn(a * x + b for a, b in lines)
+            for x in sorted(random.randint(-20, 20) for _ in range(10)):
+                assert cht.get_monotone(x) == fn(a * x + b for a, b in lines)
@@ -1,47 +1,135 @@
-import atcoder.fenwicktree
+class FastSet:
+    """
+    [0, n) の整数の集合
+    64 分木のビットセットで、add, discard, next, prev が O(log_64 N)
+    https://github.com/maspypy/library/blob/main/ds/fastset.hpp
+    """
+
+    def __init__(self, n):
+        """
+        :param int n:
+        """
+        self._n = n
+        self._size = 0
+        # self._seg[h][i] の j ビット目: self._seg[h - 1][i * 64 + j] が 0 でないかどうか
+        self._seg = []
+        while True:
+            n = (n + 63) >> 6
+            self._seg.append([0] * n)
+            if n <= 1:
+                break
+
+    def __contains__(self, i):
+        return self._seg[0][i >> 6] >> (i & 63) & 1 == 1
+
+    def __len__(self):
+        return self._size
+
+    def add(self, i):
+        """
+        i を追加する
+        :param int i:
+        """
+        if i in self:
+            return
+        self._size += 1
+        for seg in self._seg:
+            seg[i >> 6] |= 1 << (i & 63)
+            i >>= 6
+
+    def discard(self, i):
+        """
+        i を削除する
+        :param int i:
+        """
+        if i not in self:
+            return
+        self._size -= 1
+        for seg in self._seg:
+            seg[i >> 6] &= ~(1 << (i & 63))
+            if seg[i >> 6]:
+                break
+            i >>= 6
+
+    def next(self, i):
+        """
+        i 以上の最小の要素。なければ None
+        :param int i:
+        """
+        i = max(i, 0)
+        if i >= self._n:
+            return None
+        segs = self._seg
+        for h, seg in enumerate(segs):
+            if (i >> 6) == len(seg):
+                break
+            d = seg[i >> 6] >> (i & 63)
+            if d == 0:
+                i = (i >> 6) + 1
+                continue
+            # 見つかったので、一番小さいビットをたどって葉まで降りる
+            i += (d & -d).bit_length() - 1
+            for g in reversed(range(h)):
+                i <<= 6
+                d = segs[g][i >> 6]
+                i += (d & -d).bit_length() - 1
+            return i
+        return None
+
+    def prev(self, i):
+        """
+        i 以下の最大の要素。なければ None
+        :param int i:
+        """
+        if i >= self._n:
+            i = self._n - 1
+        segs = self._seg
+        for h, seg in enumerate(segs):
+            if i < 0:
+                break
+            d = seg[i >> 6] & ((2 << (i & 63)) - 1)
+            if d == 0:
+                i = (i >> 6) - 1
+                continue
+            # 見つかったので、一番大きいビットをたどって葉まで降りる
+            i = (i >> 6 << 6) + d.bit_length() - 1
+            for g in reversed(range(h)):
+                i <<= 6
+                i += segs[g][i >> 6].bit_length() - 1
+            return i
+        return None
 
 
 class Map:
     """
     重複なしのソートされた整数列
-    左右からの pop が O(log^2 N)
-    Verify (TLE): https://atcoder.jp/contests/abc406/submissions/65945423
+    左右からの pop が O(log_64 N)
     """
 
     def __init__(self, n):
         self._n = n
-        self._ft = atcoder.fenwicktree.FenwickTree(n)
-        self._left = None
-        self._right = None
+        self._fs = FastSet(n)
         self._hist = []
 
     def add(self, i, add_hist=True):
-        if self._ft.sum(i, i + 1) > 0:
+        if i in self._fs:
             return
-        self._ft.add(i, 1)
+        self._fs.add(i)
         if add_hist:
             self._hist.append((i, 1))
-        if self._left is not None and i < self._left:
-            self._left = i
-        if self._right is not None and i > self._right:
-            self._right = i
 
     def remove(self, i, add_hist=True):
-        if self._ft.sum(i, i + 1) == 0:
+        if i not in self._fs:
             raise ValueError("remove from empty deque")
-        self._ft.add(i, -1)
+        self._fs.discard(i)
         if add_hist:
             self._hist.append((i, -1))
-        if self._left == i:
-            self._left = None
-        if self._right == i:
-            self._right = None
 
     def contains(self, i):
-        return self._ft.sum(i, i + 1) > 0
+        return i in self._fs
 
     def count(self):
-        return self._ft.sum(0, self._n)
+        return len(self._fs)
 
     @property
     def hist(self):
@@ -57,46 +145,82 @@ class Map:
             self.add(i, False)
 
     def peek(self):
-        if self._right is not None:
-            return self._right
-        if self.count() == 0:
+        ret = self._fs.prev(self._n - 1)
+        if ret is None:
             raise IndexError("pop from an empty deque")
-        s = self.count()
-        ok = self._n
-        ng = -1
-        while abs(ok - ng) > 1:
-            mid = (ok + ng) // 2
-            if self._ft.sum(0, mid + 1) == s:
-                ok = mid
-            else:
-                ng = mid
-        self._right = ok
-        return ok
+        return ret
 
     def peekleft(self):
-        if self._left is not None:
-            return self._left
-        if self.count() == 0:
+        ret = self._fs.next(0)
+        if ret is None:
             raise IndexError("pop from an empty deque")
-        ok = self._n
-        ng = -1
-        while abs(ok - ng) > 1:
-            mid = (ok + ng) // 2
-            if self._ft.sum(0, mid + 1) > 0:
-                ok = mid
-            else:
-                ng = mid
-        self._left = ok
-        return ok
+        return ret
 
     def pop(self):
         ok = self.peek()
         self.remove(ok)
-        self._right = None
         return ok
 
     def popleft(self):
         ok = self.peekleft()
         self.remove(ok)
-        self._left = None
         return ok
+
+
+if __name__ == "__main__":
+    import random
+
+    # Test FastSet
+    for n in (1, 10, 64, 65, 300, 5000):
+        fs = FastSet(n)
+        test = set()
+        for _ in range(300):
+            i = random.randrange(n)
+            if random.random() < 0.6:
+                fs.add(i)
+                test.add(i)
+            else:
+                fs.discard(i)
+                test.discard(i)
+            assert len(fs) == len(test)
+            assert (i in fs) == (i in test)
+            i = random.randint(-1, n)
+            assert fs.next(i) == min((v for v in test if v >= i), default=None)
+            assert fs.prev(i) == max((v for v in test if v <= i), default=None)
+
+    # Test Map
+    for n in (1, 10, 100, 1000):
+        m = Map(n)
+        test = set()
+        hist = []
+        for _ in range(300):
+            kind = random.randrange(5)
+            i = random.randrange(n)
+            if kind == 0:
+                m.add(i)
+                if i not in test:
+                    test.add(i)
+                    hist.append((i, 1))
+            elif kind == 1 and i in test:
+                m.remove(i)
+                test.remove(i)
+                hist.append((i, -1))
+            elif kind == 2 and hist:
+                m.revert()
+                i, v = hist.pop()
+                if v > 0:
+                    test.remove(i)
+                else:
+                    test.add(i)
+            elif kind == 3 and test:
+                assert m.peek() == max(test)
+                assert m.pop() == max(test)
+                hist.append((max(test), -1))
+                test.remove(max(test))
+            elif kind == 4 and test:
+                assert m.peekleft() == min(test)
+                assert m.popleft() == min(test)
+                hist.append((min(test), -1))
+                test.remove(min(test))
+            assert m.count() == len(test)
+            assert all(m.contains(i) == (i in test) for i in range(n))
@@ -1,6 +1,3 @@
-import math
-
-
 def hilbert_order(x, y, pow, rotate=0):
     """
     https://codeforces.com/blog/entry/61203
@@ -38,14 +35,32 @@ def hilbert_order(x, y, pow, rotate=0):
     return ans
 
 
+def mo_order(queries, N):
+    """
+    Mo's algorithm でクエリを処理する順番
+    l をブロックに分けて、ブロックの偶奇で r の昇順・降順を入れ替える
+    :param list of (int, int) queries: 半開区間 [l, r) のリスト
+    :param int N: 列の長さ
+    :return: クエリのインデックスのリスト
+    :rtype: list of int
+    """
+    sqr = max(1, int(N / max(1, len(queries)) ** 0.5))
+    return sorted(
+        range(len(queries)),
+        key=lambda i: (
+            queries[i][0] // sqr,
+            queries[i][1] if queries[i][0] // sqr % 2 == 0 else -queries[i][1],
+        ),
+    )
+
+
 if __name__ == "__main__":
     N = 10**5
     QUERIES = []
     # mo's algorithm
-    sqr = math.sqrt(N)
     LRI = [(l, r + 1, i) for i, (l, r) in enumerate(QUERIES)]
-    LRI.sort(key=lambda x: (x[0] // sqr, x[1] if x[0] // sqr % 2 == 0 else -x[1]))
-    # p = math.ceil(math.log2(N))
+    LRI = [LRI[i] for i in mo_order([(l, r) for l, r, _ in LRI], N)]
+    # p = (N - 1).bit_length()
     # LRI.sort(key=lambda x: hilbert_order(x[0], x[1], p))
     for l, r, i in LRI:
         # ans[i] = ...
@@ -1,17 +1,18 @@
 import operator
-from collections import defaultdict
 from functools import reduce
 
 
 class SegmentTree:
     # http://codeforces.com/blog/entry/18051
-    def __init__(self, values, op=operator.add):
+    def __init__(self, values, op=operator.add, e=None):
         """
         :param list values:
         :param callable op: 結合律を満たす二項演算
+        :param e: op の単位元。None のときは空区間を None として扱う
         """
         self._size = len(values)
         self._op = op
+        self._e = e
         tree = [None] * self._size * 2
         tree[self._size :] = values[:]
         for i in reversed(range(1, self._size)):
@@ -24,13 +25,41 @@ class SegmentTree:
         :param int i:
         :param value:
         """
+        tree = self._tree
+        op = self._op
         i += self._size
-        self._tree[i] = value
+        tree[i] = value
         i >>= 1
         while i > 0:
-            self._tree[i] = self._op(self._tree[i << 1], self._tree[i << 1 | 1])
+            tree[i] = op(tree[i << 1], tree[i << 1 | 1])
             i >>= 1
 
+    def set_many(self, indices, values):
+        """
+        values[indices[j]] = values[j] をまとめて行う
+        更新された葉の祖先だけを 1 段ずつ再計算する
+        :param list of int indices:
+        :param list values:
+        """
+        size = self._size
+        tree = self._tree
+        op = self._op
+        parents = set()
+        for i, value in zip(indices, values):
+            i += size
+            tree[i] = value
+            parents.add(i >> 1)
+        # size が 2 冪でないと葉の深さが揃わないので、
+        # 子が後から更新された親は次の段でもう一度計算される
+        parents.discard(0)
+        while parents:
+            next_parents = set()
+            for i in parents:
+                tree[i] = op(tree[i << 1], tree[i << 1 | 1])
+                next_parents.add(i >> 1)
+            next_parents.discard(0)
+            parents = next_parents
+
     def add(self, i, value):
         """
         values[i] = values[i]・value
@@ -43,25 +72,116 @@ class SegmentTree:
     def get(self, l, r=None):
         """
         [l, r) に op を順番に適用した値
+        空区間なら e
         :param int l:
         :param int|None r:
         """
+        tree = self._tree
         if r is None:
-            return self._tree[self._size + l]
-        ret_l = []
-        ret_r = []
+            return tree[self._size + l]
+        op = self._op
+        # 左右から畳み込む; op が可換でなくてもいいように sml・smr の順で最後に合わせる
+        sml = smr = self._e
         l += self._size
         r += self._size
         while l < r:
             if l & 1:
-                ret_l.append(self._tree[l])
+                sml = tree[l] if sml is None else op(sml, tree[l])
                 l += 1
             if r & 1:
                 r -= 1
-                ret_r.append(self._tree[r])
+                smr = tree[r] if smr is None else op(tree[r], smr)
             l >>= 1
             r >>= 1
-        return reduce(self._op, ret_l + ret_r)
+        if sml is None:
+            return smr
+        if smr is None:
+            return sml
+        return op(sml, smr)
+
+    def max_right(self, l, pred):
+        """
+        pred(op(values[l:r])) が True となる最大の r
+        pred は単調であること (r を伸ばしていくとある所から False になる)
+        空区間に対しては True とみなす
+        https://atcoder.github.io/ac-library/production/document_ja/segtree.html
+        :param int l:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        tree = self._tree
+        op = self._op
+        # [l, size) を覆うノードを左から順に
+        lefts = []
+        rights = []
+        lo = l + size
+        hi = size + size
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        acc = self._e
+        for k in lefts + rights[::-1]:
+            v = tree[k] if acc is None else op(acc, tree[k])
+            if pred(v):
+                acc = v
+                continue
+            # k の中で pred が False になる位置まで降りていく
+            while k < size:
+                k <<= 1
+                v = tree[k] if acc is None else op(acc, tree[k])
+                if pred(v):
+                    acc = v
+                    k += 1
+            return k - size
+        return size
+
+    def min_left(self, r, pred):
+        """
+        pred(op(values[l:r])) が True となる最小の l
+        pred は単調であること (l を縮めていくとある所から False になる)
+        空区間に対しては True とみなす
+        :param int r:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        tree = self._tree
+        op = self._op
+        # [0, r) を覆うノードを右から順に
+        lefts = []
+        rights = []
+        lo = size
+        hi = r + size
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        acc = self._e
+        for k in rights + lefts[::-1]:
+            v = tree[k] if acc is None else op(tree[k], acc)
+            if pred(v):
+                acc = v
+                continue
+            while k < size:
+                k = k << 1 | 1
+                v = tree[k] if acc is None else op(tree[k], acc)
+                if pred(v):
+                    acc = v
+                    k -= 1
+            return k + 1 - size
+        return 0
 
     def get_values_copy(self):
         """
@@ -73,17 +193,60 @@ class SegmentTree:
         return self._size
 
 
-class DynamicSegmentTree:
-    def __init__(self, size, e, op=operator.add):
+# NumpySegmentTree の op と ufunc の名前の対応
+_NUMPY_UFUNCS = {
+    "sum": "add",
+    "min": "minimum",
+    "max": "maximum",
+    "xor": "bitwise_xor",
+}
+
+
+class NumpySegmentTree:
+    """
+    numpy の配列で持つセグ木
+    op は可換なもの (sum, min, max, xor) のみ
+    get_many でクエリをまとめて処理すると、1 段ずつ全クエリをベクトル演算で進める
+    """
+
+    def __init__(self, values, op="sum", dtype=None):
         """
-        セグ木の配列を defaultdict に変えただけ
-        おっそいので使用非推奨
-        後日ちゃんと実装するか C++ に変換して使う
-        https://atcoder.jp/contests/abc403/submissions/65324407
+        :param values:
+        :param str op: "sum", "min", "max", "xor" のどれか
+        :param dtype: np.int64 か np.float64; None なら np.int64
         """
+        import numpy as np
+
+        if dtype is None:
+            dtype = np.int64
+        self._ufunc = getattr(np, _NUMPY_UFUNCS[op])
+        self._e = self._identity(op, dtype)
+        self._n = len(values)
+        size = 1
+        while size < self._n:
+            size <<= 1
         self._size = size
-        self._op = op
-        self._tree = defaultdict(lambda: e)
+        tree = np.full(size * 2, self._e, dtype=dtype)
+        tree[size : size + self._n] = values
+        # 1 段ずつまとめて構築
+        k = size >> 1
+        while k > 0:
+            tree[k : k * 2] = self._ufunc(
+                tree[k * 2 : k * 4 : 2], tree[k * 2 + 1 : k * 4 : 2]
+            )
+            k >>= 1
+        self._tree = tree
+
+    @staticmethod
+    def _identity(op, dtype):
+        import numpy as np
+
+        if op == "sum" or op == "xor":
+            return 0
+        if np.issubdtype(dtype, np.floating):
+            return np.inf if op == "min" else -np.inf
+        info = np.iinfo(dtype)
+        return info.max if op == "min" else info.min
 
     def set(self, i, value):
         """
@@ -91,86 +254,1030 @@ class DynamicSegmentTree:
         :param int i:
         :param value:
         """
+        tree = self._tree
+        ufunc = self._ufunc
         i += self._size
-        self._tree[i] = value
+        tree[i] = value
         i >>= 1
         while i > 0:
-            self._tree[i] = self._op(self._tree[i << 1], self._tree[i << 1 | 1])
+            tree[i] = ufunc(tree[i << 1], tree[i << 1 | 1])
             i >>= 1
 
+    def set_many(self, indices, values):
+        """
+        values[indices[j]] = values[j] をまとめて行う
+        同じインデックスが複数あるときは最後のものが入る
+        :param indices:
+        :param values:
+        """
+        import numpy as np
+
+        tree = self._tree
+        idx = np.asarray(indices, dtype=np.int64) + self._size
+        if len(idx) == 0:
+            return
+        tree[idx] = values
+        # 葉の深さが揃っているので、親を 1 段ずつまとめて再計算できる
+        idx = np.unique(idx >> 1)
+        while idx[0] > 0:
+            tree[idx] = self._ufunc(tree[idx << 1], tree[idx << 1 | 1])
+            idx = np.unique(idx >> 1)
+
+    def get(self, l, r=None):
+        """
+        [l, r) に op を適用した値
+        :param int l:
+        :param int|None r:
+        """
+        tree = self._tree
+        if r is None:
+            return tree[self._size + l]
+        ufunc = self._ufunc
+        ret = self._e
+        l += self._size
+        r += self._size
+        while l < r:
+            if l & 1:
+                ret = ufunc(ret, tree[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                ret = ufunc(ret, tree[r])
+            l >>= 1
+            r >>= 1
+        return ret
+
+    def get_many(self, ls, rs):
+        """
+        各 j について [ls[j], rs[j]) に op を適用した値
+        :param ls:
+        :param rs:
+        :rtype: np.ndarray
+        """
+        import numpy as np
+
+        tree = self._tree
+        ufunc = self._ufunc
+        l = np.asarray(ls, dtype=np.int64) + self._size
+        r = np.asarray(rs, dtype=np.int64) + self._size
+        ret = np.full(len(l), self._e, dtype=tree.dtype)
+        while True:
+            active = l < r
+            if not active.any():
+                break
+            m = active & (l & 1 == 1)
+            ret[m] = ufunc(ret[m], tree[l[m]])
+            l += m
+            m = active & (r & 1 == 1)
+            r -= m
+            ret[m] = ufunc(ret[m], tree[r[m]])
+            l >>= 1
+            r >>= 1
+        return ret
+
+    def get_values_copy(self):
+        """
+        O(N) で全部の値を取得
+        """
+        return self._tree[self._size : self._size + self._n].copy()
+
+    def __len__(self):
+        return self._n
+
+
+class PersistentSegmentTree:
+    """
+    永続セグ木
+    set のたびに根から葉までのパスだけをコピーして新しいバージョンを作る
+    ノードは left, right, value の配列で持つ
+    """
+
+    def __init__(self, values, op=operator.add, e=0, max_updates=None):
+        """
+        最初のバージョンは 0
+        :param list values:
+        :param callable op: 結合律を満たす二項演算
+        :param e: op の単位元
+        :param int|None max_updates: set の回数の上限。指定すると最初に配列を確保する
+        """
+        self._n = len(values)
+        self._op = op
+        self._e = e
+        log = 0
+        while (1 << log) < self._n:
+            log += 1
+        self._log = log
+        size = 1 << log
+        # 最初のバージョンはヒープと同じ並び; ノード k の子は 2k, 2k+1
+        n_nodes = size * 2
+        if max_updates is not None:
+            n_nodes += max_updates * (log + 1)
+        left = [0] * n_nodes
+        right = [0] * n_nodes
+        value = [e] * n_nodes
+        value[size : size + self._n] = values[:]
+        for k in reversed(range(1, size)):
+            left[k] = k << 1
+            right[k] = k << 1 | 1
+            value[k] = op(value[k << 1], value[k << 1 | 1])
+        self._left = left
+        self._right = right
+        self._value = value
+        # 使用中のノード数
+        self._count = size * 2
+        self._roots = [1]
+
+    def _new_node(self, l, r, v):
+        i = self._count
+        self._count += 1
+        if i < len(self._value):
+            self._left[i] = l
+            self._right[i] = r
+            self._value[i] = v
+        else:
+            self._left.append(l)
+            self._right.append(r)
+            self._value.append(v)
+        return i
+
+    def set(self, version, i, value):
+        """
+        version の values[i] を value にした新しいバージョンを作る
+        :param int version:
+        :param int i:
+        :param value:
+        :return: 新しいバージョン
+        :rtype: int
+        """
+        left = self._left
+        right = self._right
+        path = []
+        node = self._roots[version]
+        for h in reversed(range(self._log)):
+            path.append(node)
+            node = right[node] if i >> h & 1 else left[node]
+        # 葉から根に向かってコピーする
+        new = self._new_node(0, 0, value)
+        value = self._value
+        for h in range(self._log):
+            old = path[~h]
+            if i >> h & 1:
+                l, r = left[old], new
+            else:
+                l, r = new, right[old]
+            new = self._new_node(l, r, self._op(value[l], value[r]))
+        self._roots.append(new)
+        return len(self._roots) - 1
+
+    def add(self, version, i, value):
+        """
+        version の values[i] を values[i]・value にした新しいバージョンを作る
+        :param int version:
+        :param int i:
+        :param value:
+        :rtype: int
+        """
+        return self.set(version, i, self._op(self.get(version, i), value))
+
+    def get(self, version, l, r=None):
+        """
+        version の [l, r) に op を順番に適用した値
+        :param int version:
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        op = self._op
+        left = self._left
+        right = self._right
+        value = self._value
+        ret = self._e
+        stack = [(self._roots[version], 0, 1 << self._log)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if r <= lo or hi <= l:
+                continue
+            if l <= lo and hi <= r:
+                ret = op(ret, value[node])
+                continue
+            mid = (lo + hi) >> 1
+            # 左から順に op を適用する
+            stack.append((right[node], mid, hi))
+            stack.append((left[node], lo, mid))
+        return ret
+
+    def kth(self, version_lo, version_hi, k):
+        """
+        op が add で values を個数として使うとき、
+        (version_hi の個数) - (version_lo の個数) で k 番目 (0-indexed) のインデックス
+        values[i] = (A の中の値 i の個数) として A を先頭から 1 つずつ追加したバージョンを作っておくと、
+        kth(l, r, k) で A[l:r] の k 番目に小さい値がわかる
+        :param int version_lo:
+        :param int version_hi:
+        :param int k:
+        :rtype: int
+        """
+        left = self._left
+        right = self._right
+        value = self._value
+        a = self._roots[version_lo]
+        b = self._roots[version_hi]
+        ret = 0
+        for _ in range(self._log):
+            cnt = value[left[b]] - value[left[a]]
+            if k < cnt:
+                a, b = left[a], left[b]
+                ret <<= 1
+            else:
+                k -= cnt
+                a, b = right[a], right[b]
+                ret = ret << 1 | 1
+        return ret
+
+    def __len__(self):
+        return self._n
+
+
+class DynamicSegmentTree:
+    """
+    必要なノードだけ作るセグ木
+    [0, size) の size が 10^18 とかでも、更新 1 回あたり O(log size) 個しかノードを作らない
+    ノードは left, right, value の配列で持つ (ポインタなし)
+    lazy_add=True なら区間 add もできる (op は add, min, max のどれか)
+    https://atcoder.jp/contests/abc403/submissions/65324407
+    """
+
+    def __init__(self, size, e, op=operator.add, lazy_add=False, max_nodes=None):
+        """
+        値を入れていない位置は e
+        :param int size:
+        :param e: op の単位元
+        :param callable op: 結合律を満たす二項演算
+        :param bool lazy_add: 区間 add を使うかどうか
+        :param int|None max_nodes: ノード数の上限。指定すると最初に確保して使い回す
+        """
+        assert not lazy_add or op in (operator.add, min, max)
+        self._size = size
+        self._e = e
+        self._op = op
+        # 区間 add が区間の長さ倍になるかどうか
+        self._scale = op is operator.add
+        self._max_nodes = max_nodes
+        n = max_nodes or 1
+        # -1 は子がいない
+        self._left = [-1] * n
+        self._right = [-1] * n
+        self._value = [e] * n
+        # ノードの子孫全体に足されている値。self._value には織り込み済み
+        self._lazy = [0] * n if lazy_add else None
+        # 使用中のノード数; 0 が root
+        self._count = 1
+
+    def clear(self):
+        """
+        全部 e に戻す。確保済みの配列はそのまま使い回す
+        """
+        self._count = 1
+        self._left[0] = self._right[0] = -1
+        self._value[0] = self._e
+        if self._lazy is not None:
+            self._lazy[0] = 0
+
+    def _new_node(self):
+        i = self._count
+        if i < len(self._left):
+            self._left[i] = self._right[i] = -1
+            self._value[i] = self._e
+            if self._lazy is not None:
+                self._lazy[i] = 0
+        else:
+            # 足りなければ何も変えずに例外
+            if self._max_nodes is not None:
+                raise MemoryError("ノード数が max_nodes を超えました")
+            self._left.append(-1)
+            self._right.append(-1)
+            self._value.append(self._e)
+            if self._lazy is not None:
+                self._lazy.append(0)
+        self._count = i + 1
+        return i
+
+    def _pull(self, node, length):
+        """
+        子から value[node] を計算しなおす
+        :param int node:
+        :param int length: node の区間の長さ
+        """
+        lc = self._left[node]
+        rc = self._right[node]
+        v = self._op(
+            self._value[lc] if lc >= 0 else self._e,
+            self._value[rc] if rc >= 0 else self._e,
+        )
+        if self._lazy is not None:
+            v += self._lazy[node] * length if self._scale else self._lazy[node]
+        self._value[node] = v
+
+    def set(self, i, value):
+        """
+        values[i] = value
+        :param int i:
+        :param value:
+        """
+        left = self._left
+        right = self._right
+        lazy = self._lazy
+        path = []
+        node = 0
+        lo, hi = 0, self._size
+        # 祖先の lazy の合計
+        acc = 0
+        while hi - lo > 1:
+            path.append((node, hi - lo))
+            if lazy is not None:
+                acc += lazy[node]
+            mid = (lo + hi) >> 1
+            if i < mid:
+                if left[node] < 0:
+                    left[node] = self._new_node()
+                node = left[node]
+                hi = mid
+            else:
+                if right[node] < 0:
+                    right[node] = self._new_node()
+                node = right[node]
+                lo = mid
+        self._value[node] = value - acc if lazy is not None else value
+        for node, length in reversed(path):
+            self._pull(node, length)
+
     def add(self, i, value):
         """
-        values[i] = values[i]・value
-        :param int i:
+        values[i] = values[i]・value
+        :param int i:
+        :param value:
+        """
+        self.set(i, self._op(self.get(i), value))
+
+    def range_add(self, l, r, value):
+        """
+        [l, r) に value を加算する
+        lazy_add=True のときだけ使える
+        :param int l:
+        :param int r:
+        :param value:
+        """
+        assert self._lazy is not None
+        left = self._left
+        right = self._right
+        lazy = self._lazy
+        val = self._value
+        # 全部かぶってるノード
+        covered = []
+        # 一部だけかぶってるノード; 行きがけ順
+        partial = []
+        # 先にノードを全部作る; 途中で MemoryError になっても値は変わらない
+        stack = [(0, 0, self._size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if l <= lo and hi <= r:
+                covered.append((node, hi - lo))
+                continue
+            partial.append((node, hi - lo))
+            mid = (lo + hi) >> 1
+            if l < mid:
+                if left[node] < 0:
+                    left[node] = self._new_node()
+                stack.append((left[node], lo, mid))
+            if mid < r:
+                if right[node] < 0:
+                    right[node] = self._new_node()
+                stack.append((right[node], mid, hi))
+        for node, length in covered:
+            val[node] += value * length if self._scale else value
+            if length > 1:
+                lazy[node] += value
+        # 帰りがけに子から計算しなおす
+        for node, length in reversed(partial):
+            self._pull(node, length)
+
+    def get(self, l, r=None):
+        """
+        [l, r) に op を順番に適用した値
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        op = self._op
+        left = self._left
+        right = self._right
+        val = self._value
+        lazy = self._lazy
+        scale = self._scale
+        ret = self._e
+        # (node, lo, hi, 祖先の lazy の合計)
+        stack = [(0, 0, self._size, 0)]
+        while stack:
+            node, lo, hi, acc = stack.pop()
+            if r <= lo or hi <= l:
+                continue
+            if node < 0:
+                # 値を入れていない区間
+                if acc:
+                    if scale:
+                        ret = op(ret, acc * (min(hi, r) - max(lo, l)))
+                    else:
+                        ret = op(ret, self._e + acc)
+                continue
+            if l <= lo and hi <= r:
+                if acc:
+                    ret = op(ret, val[node] + (acc * (hi - lo) if scale else acc))
+                else:
+                    ret = op(ret, val[node])
+                continue
+            if lazy is not None:
+                acc += lazy[node]
+            mid = (lo + hi) >> 1
+            # 左から順に op を適用する
+            stack.append((right[node], mid, hi, acc))
+            stack.append((left[node], lo, mid, acc))
+        return ret
+
+    def __len__(self):
+        return self._size
+
+
+class LazySegmentTreeAddMin:
+    # 区間 Add、区間 Min
+    # http://codeforces.com/blog/entry/18051
+    def __init__(self, values):
+        """
+        :param list values:
+        """
+        # Add の単位元
+        self._id = 0
+        # Min の単位元
+        self._e = float("inf")
+        self._size = len(values)
+        self._fn = min
+
+        tree = [self._id] * self._size * 2
+        tree[self._size :] = values[:]
+        for i in reversed(range(1, self._size)):
+            tree[i] = self._fn(tree[i << 1], tree[i << 1 | 1])
+        self._tree = tree
+        self._delay = [self._id] * self._size * 2
+
+    def _add(self, p, value):
+        # p 以下の子どもたちに一様に value を加算する
+        # self._tree[p] は self._delay[p] を織り込み済み
+        self._tree[p] += value
+        if p < self._size:
+            self._delay[p] += value
+
+    def _update(self, p):
+        """
+        self._tree[p] の親たちを最新化する
+        :param int p:
+        """
+        while p > 1:
+            p >>= 1
+            self._tree[p] = (
+                self._fn(
+                    self._tree[p << 1],
+                    self._tree[p << 1 | 1],
+                )
+                + self._delay[p]
+            )
+
+    def _push(self, k):
+        """
+        self._delay[k] を子どもたちに移す
+        :param int k:
+        """
+        self._add(k << 1, self._delay[k])
+        self._add(k << 1 | 1, self._delay[k])
+        self._delay[k] = self._id
+
+    def _eval(self, p):
+        """
+        self._tree[p] に遅延配列から値を移す
+        :param int p:
+        """
+        # root から葉に向かって遅延配列を移していく
+        for h in reversed(range(1, p.bit_length())):
+            self._push(p >> h)
+
+    def add(self, l, r, value):
+        """
+        [l, r) に value を加算する
+        :param int l:
+        :param int r:
+        :param value:
+        """
+        l += self._size
+        r += self._size
+        l0, r0 = l, r
+        while l < r:
+            if l & 1:
+                # 右側の子
+                self._add(l, value)
+                l += 1
+            if r & 1:
+                # 左側の子
+                r -= 1
+                self._add(r, value)
+            l >>= 1
+            r >>= 1
+        self._update(l0)
+        self._update(r0 - 1)
+
+    apply = add
+
+    def get(self, l, r=None):
+        """
+        [l, r) の Min
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        ret_l = []
+        ret_r = []
+        l += self._size
+        r += self._size
+        self._eval(l)
+        self._eval(r - 1)
+        while l < r:
+            if l & 1:
+                ret_l.append(self._tree[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                ret_r.append(self._tree[r])
+            l >>= 1
+            r >>= 1
+        return reduce(self._fn, ret_l + ret_r[::-1])
+
+    def max_right(self, l, pred):
+        """
+        pred(FN(values[l:r])) が True となる最大の r
+        pred は単調であること (r を伸ばしていくとある所から False になる)
+        :param int l:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        if l >= size:
+            return size
+        lefts = []
+        rights = []
+        lo = l + size
+        hi = size + size
+        self._eval(lo)
+        self._eval(hi - 1)
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        tree = self._tree
+        acc = self._e
+        for k in lefts + rights[::-1]:
+            v = self._fn(acc, tree[k])
+            if pred(v):
+                acc = v
+                continue
+            # k の中で pred が False になる位置まで降りていく
+            while k < size:
+                self._push(k)
+                k <<= 1
+                v = self._fn(acc, tree[k])
+                if pred(v):
+                    acc = v
+                    k += 1
+            return k - size
+        return size
+
+    def min_left(self, r, pred):
+        """
+        pred(FN(values[l:r])) が True となる最小の l
+        pred は単調であること (l を縮めていくとある所から False になる)
+        :param int r:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        if r <= 0:
+            return 0
+        lefts = []
+        rights = []
+        lo = size
+        hi = r + size
+        self._eval(lo)
+        self._eval(hi - 1)
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        tree = self._tree
+        acc = self._e
+        for k in rights + lefts[::-1]:
+            v = self._fn(tree[k], acc)
+            if pred(v):
+                acc = v
+                continue
+            while k < size:
+                self._push(k)
+                k = k << 1 | 1
+                v = self._fn(tree[k], acc)
+                if pred(v):
+                    acc = v
+                    k -= 1
+            return k + 1 - size
+        return 0
+
+
+class LazySegmentTreeAddSum:
+    # 区間 Add、区間 Sum
+    # http://codeforces.com/blog/entry/18051
+    def __init__(self, values):
+        """
+        :param list values:
+        """
+        # Add の単位元
+        self._id = 0
+        # Sum の単位元
+        self._e = 0
+        self._size = len(values)
+        self._fn = operator.add
+
+        tree = [self._id] * self._size * 2
+        tree[self._size :] = values[:]
+        for i in reversed(range(1, self._size)):
+            tree[i] = self._fn(tree[i << 1], tree[i << 1 | 1])
+        self._tree = tree
+        self._delay = [self._id] * self._size * 2
+
+        children = [0] * len(self._tree)
+        for i in range(self._size):
+            children[~i] = 1
+        for i in reversed(range(1, len(self._tree))):
+            children[i >> 1] += children[i]
+        self._children = children
+
+    def _add(self, p, value):
+        # p 以下の子どもたちに一様に value を加算する
+        # self._tree[p] は self._delay[p] を織り込み済み
+        self._tree[p] += value * self._children[p]
+        if p < self._size:
+            self._delay[p] += value
+
+    def _update(self, p):
+        """
+        self._tree[p] の親たちを最新化する
+        :param int p:
+        """
+        while p > 1:
+            p >>= 1
+            self._tree[p] = (
+                self._fn(
+                    self._tree[p << 1],
+                    self._tree[p << 1 | 1],
+                )
+                + self._delay[p] * self._children[p]
+            )
+
+    def _push(self, k):
+        """
+        self._delay[k] を子どもたちに移す
+        :param int k:
+        """
+        self._add(k << 1, self._delay[k])
+        self._add(k << 1 | 1, self._delay[k])
+        self._delay[k] = self._id
+
+    def _eval(self, p):
+        """
+        self._tree[p] に遅延配列から値を移す
+        :param int p:
+        """
+        # root から葉に向かって遅延配列を移していく
+        for h in reversed(range(1, p.bit_length())):
+            self._push(p >> h)
+
+    def add(self, l, r, value):
+        """
+        [l, r) に value を加算する
+        :param int l:
+        :param int r:
+        :param value:
+        """
+        l += self._size
+        r += self._size
+        l0, r0 = l, r
+        while l < r:
+            if l & 1:
+                # 右側の子
+                self._add(l, value)
+                l += 1
+            if r & 1:
+                # 左側の子
+                r -= 1
+                self._add(r, value)
+            l >>= 1
+            r >>= 1
+        self._update(l0)
+        self._update(r0 - 1)
+
+    apply = add
+
+    def get(self, l, r=None):
+        """
+        [l, r) の合計
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        ret_l = []
+        ret_r = []
+        l += self._size
+        r += self._size
+        self._eval(l)
+        self._eval(r - 1)
+        while l < r:
+            if l & 1:
+                ret_l.append(self._tree[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                ret_r.append(self._tree[r])
+            l >>= 1
+            r >>= 1
+        return reduce(self._fn, ret_l + ret_r[::-1])
+
+    def max_right(self, l, pred):
+        """
+        pred(FN(values[l:r])) が True となる最大の r
+        pred は単調であること (r を伸ばしていくとある所から False になる)
+        :param int l:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        if l >= size:
+            return size
+        lefts = []
+        rights = []
+        lo = l + size
+        hi = size + size
+        self._eval(lo)
+        self._eval(hi - 1)
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        tree = self._tree
+        acc = self._e
+        for k in lefts + rights[::-1]:
+            v = self._fn(acc, tree[k])
+            if pred(v):
+                acc = v
+                continue
+            # k の中で pred が False になる位置まで降りていく
+            while k < size:
+                self._push(k)
+                k <<= 1
+                v = self._fn(acc, tree[k])
+                if pred(v):
+                    acc = v
+                    k += 1
+            return k - size
+        return size
+
+    def min_left(self, r, pred):
+        """
+        pred(FN(values[l:r])) が True となる最小の l
+        pred は単調であること (l を縮めていくとある所から False になる)
+        :param int r:
+        :param callable pred:
+        :rtype: int
+        """
+        size = self._size
+        if r <= 0:
+            return 0
+        lefts = []
+        rights = []
+        lo = size
+        hi = r + size
+        self._eval(lo)
+        self._eval(hi - 1)
+        while lo < hi:
+            if lo & 1:
+                lefts.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rights.append(hi)
+            lo >>= 1
+            hi >>= 1
+        tree = self._tree
+        acc = self._e
+        for k in rights + lefts[::-1]:
+            v = self._fn(tree[k], acc)
+            if pred(v):
+                acc = v
+                continue
+            while k < size:
+                self._push(k)
+                k = k << 1 | 1
+                v = self._fn(tree[k], acc)
+                if pred(v):
+                    acc = v
+                    k -= 1
+            return k + 1 - size
+        return 0
+
+
+class LazySegmentTreeChmaxMax:
+    # 区間 chmax、区間 max
+    # https://atcoder.jp/contests/abc382/submissions/61522085
+    # http://codeforces.com/blog/entry/18051
+    def __init__(self, values):
+        """
+        :param list values:
+        """
+        # chmax の恒等写像、max の単位元
+        self._id = -float("inf")
+        self._size = len(values)
+
+        tree = [self._id] * self._size * 2
+        tree[self._size :] = values[:]
+        for i in reversed(range(1, self._size)):
+            a, b = tree[i << 1], tree[i << 1 | 1]
+            tree[i] = max(a, b)
+        self._tree = tree
+        self._delay = [self._id] * self._size * 2
+
+    def _chmax(self, p, value):
+        # p 以下の子どもたちを一様に value で chmax する
+        # self._tree[p] は self._delay[p] を織り込み済み
+        self._tree[p] = max(self._tree[p], value)
+        if p < self._size and self._delay[p] < value:
+            self._delay[p] = value
+
+    def _update(self, p):
+        """
+        self._tree[p] の親たちを最新化する
+        :param int p:
+        """
+        tree = self._tree
+        delay = self._delay
+        while p > 1:
+            p >>= 1
+            a, b, d = tree[p << 1], tree[p << 1 | 1], delay[p]
+            a = max(a, b)
+            tree[p] = max(a, d)
+
+    def _push(self, k):
+        """
+        self._delay[k] を子どもたちに移す
+        :param int k:
+        """
+        if self._delay[k] != self._id:
+            self._chmax(k << 1, self._delay[k])
+            self._chmax(k << 1 | 1, self._delay[k])
+            self._delay[k] = self._id
+
+    def _eval(self, p):
+        """
+        self._tree[p] に遅延配列から値を移す
+        :param int p:
+        """
+        # root から葉に向かって遅延配列を移していく
+        for h in reversed(range(1, p.bit_length())):
+            self._push(p >> h)
+
+    def chmax(self, l, r, value):
+        """
+        [l, r) を value で chmax する
+        :param int l:
+        :param int r:
         :param value:
         """
-        new_value = self._op(self._tree[self._size + i], value)
-        self.set(i, new_value)
+        l += self._size
+        r += self._size
+        l0, r0 = l, r
+        while l < r:
+            if l & 1:
+                self._chmax(l, value)
+                l += 1
+            if r & 1:
+                r -= 1
+                self._chmax(r, value)
+            l >>= 1
+            r >>= 1
+        self._update(l0)
+        self._update(r0 - 1)
+
+    apply = chmax
 
     def get(self, l, r=None):
         """
-        [l, r) に op を順番に適用した値
+        [l, r) の Max
         :param int l:
         :param int|None r:
         """
         if r is None:
-            return self._tree[self._size + l]
-        ret_l = []
-        ret_r = []
+            r = l + 1
+        tree = self._tree
+        ret = self._id
         l += self._size
         r += self._size
+        self._eval(l)
+        self._eval(r - 1)
         while l < r:
             if l & 1:
-                ret_l.append(self._tree[l])
+                ret = max(ret, tree[l])
                 l += 1
             if r & 1:
                 r -= 1
-                ret_r.append(self._tree[r])
+                ret = max(ret, tree[r])
             l >>= 1
             r >>= 1
-        return reduce(self._op, ret_l + ret_r)
+        return ret
 
 
-class LazySegmentTreeAddMin:
-    # 区間 Add、区間 Min
+class LazySegmentTreeAssignMax:
+    # 区間代入、区間 max
+    # https://atcoder.jp/contests/abc382/submissions/61522219
     # http://codeforces.com/blog/entry/18051
     def __init__(self, values):
         """
         :param list values:
         """
-        # Add の単位元
-        self._id = 0
+        # 代入の恒等写像
+        self._id = None
+        # max の単位元
+        self._e = -float("inf")
         self._size = len(values)
-        self._fn = min
 
-        tree = [self._id] * self._size * 2
+        tree = [self._e] * self._size * 2
         tree[self._size :] = values[:]
         for i in reversed(range(1, self._size)):
-            tree[i] = self._fn(tree[i << 1], tree[i << 1 | 1])
+            a, b = tree[i << 1], tree[i << 1 | 1]
+            tree[i] = max(a, b)
         self._tree = tree
         self._delay = [self._id] * self._size * 2
 
-    def _add(self, p, value):
-        # p 以下の子どもたちに一様に value を加算する
+    def _assign(self, p, value):
+        # p 以下の子どもたちに一様に value を代入する
         # self._tree[p] は self._delay[p] を織り込み済み
-        self._tree[p] += value
+        self._tree[p] = value
         if p < self._size:
-            self._delay[p] += value
+            self._delay[p] = value
 
     def _update(self, p):
         """
         self._tree[p] の親たちを最新化する
         :param int p:
         """
+        tree = self._tree
+        delay = self._delay
         while p > 1:
             p >>= 1
-            self._tree[p] = (
-                self._fn(
-                    self._tree[p << 1],
-                    self._tree[p << 1 | 1],
-                )
-                + self._delay[p]
-            )
+            if delay[p] is not None:
+                tree[p] = delay[p]
+            else:
+                a, b = tree[p << 1], tree[p << 1 | 1]
+                tree[p] = max(a, b)
+
+    def _push(self, k):
+        """
+        self._delay[k] を子どもたちに移す
+        :param int k:
+        """
+        if self._delay[k] is not None:
+            self._assign(k << 1, self._delay[k])
+            self._assign(k << 1 | 1, self._delay[k])
+            self._delay[k] = self._id
 
     def _eval(self, p):
         """
@@ -179,14 +1286,11 @@ class LazySegmentTreeAddMin:
         """
         # root から葉に向かって遅延配列を移していく
         for h in reversed(range(1, p.bit_length())):
-            k = p >> h
-            self._add(k << 1, self._delay[k])
-            self._add(k << 1 | 1, self._delay[k])
-            self._delay[k] = self._id
+            self._push(p >> h)
 
-    def add(self, l, r, value):
+    def assign(self, l, r, value):
         """
-        [l, r) に value を加算する
+        [l, r) に value を代入する
         :param int l:
         :param int r:
         :param value:
@@ -194,65 +1298,68 @@ class LazySegmentTreeAddMin:
         l += self._size
         r += self._size
         l0, r0 = l, r
+        # 代入は可換でないので、先に古い遅延を流しておく
+        self._eval(l0)
+        self._eval(r0 - 1)
         while l < r:
             if l & 1:
-                # 右側の子
-                self._add(l, value)
+                self._assign(l, value)
                 l += 1
             if r & 1:
-                # 左側の子
                 r -= 1
-                self._add(r, value)
+                self._assign(r, value)
             l >>= 1
             r >>= 1
         self._update(l0)
         self._update(r0 - 1)
 
+    apply = assign
+
     def get(self, l, r=None):
         """
-        [l, r) の Min
+        [l, r) の Max
         :param int l:
         :param int|None r:
         """
         if r is None:
             r = l + 1
-        ret_l = []
-        ret_r = []
+        tree = self._tree
+        ret = self._e
         l += self._size
         r += self._size
         self._eval(l)
         self._eval(r - 1)
         while l < r:
             if l & 1:
-                ret_l.append(self._tree[l])
+                ret = max(ret, tree[l])
                 l += 1
             if r & 1:
                 r -= 1
-                ret_r.append(self._tree[r])
+                ret = max(ret, tree[r])
             l >>= 1
             r >>= 1
-        return reduce(self._fn, ret_l + ret_r[::-1])
+        return ret
 
 
-class LazySegmentTreeAddSum:
-    # 区間 Add、区間 Sum
+class LazySegmentTreeAssignSum:
+    # 区間代入、区間 Sum
     # http://codeforces.com/blog/entry/18051
     def __init__(self, values):
         """
         :param list values:
         """
-        # Add の単位元
-        self._id = 0
+        # 代入の恒等写像
+        self._id = None
         self._size = len(values)
-        self._fn = operator.add
 
-        tree = [self._id] * self._size * 2
+        tree = [0] * self._size * 2
         tree[self._size :] = values[:]
         for i in reversed(range(1, self._size)):
-            tree[i] = self._fn(tree[i << 1], tree[i << 1 | 1])
+            tree[i] = tree[i << 1] + tree[i << 1 | 1]
         self._tree = tree
         self._delay = [self._id] * self._size * 2
 
+        # (sum, len) の組の代わりに区間の長さを別の配列で持つ
         children = [0] * len(self._tree)
         for i in range(self._size):
             children[~i] = 1
@@ -260,27 +1367,36 @@ class LazySegmentTreeAddSum:
             children[i >> 1] += children[i]
         self._children = children
 
-    def _add(self, p, value):
-        # p 以下の子どもたちに一様に value を加算する
+    def _assign(self, p, value):
+        # p 以下の子どもたちに一様に value を代入する
         # self._tree[p] は self._delay[p] を織り込み済み
-        self._tree[p] += value * self._children[p]
+        self._tree[p] = value * self._children[p]
         if p < self._size:
-            self._delay[p] += value
+            self._delay[p] = value
 
     def _update(self, p):
         """
         self._tree[p] の親たちを最新化する
         :param int p:
         """
+        tree = self._tree
+        delay = self._delay
         while p > 1:
             p >>= 1
-            self._tree[p] = (
-                self._fn(
-                    self._tree[p << 1],
-                    self._tree[p << 1 | 1],
-                )
-                + self._delay[p] * self._children[p]
-            )
+            if delay[p] is not None:
+                tree[p] = delay[p] * self._children[p]
+            else:
+                tree[p] = tree[p << 1] + tree[p << 1 | 1]
+
+    def _push(self, k):
+        """
+        self._delay[k] を子どもたちに移す
+        :param int k:
+        """
+        if self._delay[k] is not None:
+            self._assign(k << 1, self._delay[k])
+            self._assign(k << 1 | 1, self._delay[k])
+            self._delay[k] = self._id
 
     def _eval(self, p):
         """
@@ -289,14 +1405,11 @@ class LazySegmentTreeAddSum:
         """
         # root から葉に向かって遅延配列を移していく
         for h in reversed(range(1, p.bit_length())):
-            k = p >> h
-            self._add(k << 1, self._delay[k])
-            self._add(k << 1 | 1, self._delay[k])
-            self._delay[k] = self._id
+            self._push(p >> h)
 
-    def add(self, l, r, value):
+    def assign(self, l, r, value):
         """
-        [l, r) に value を加算する
+        [l, r) に value を代入する
         :param int l:
         :param int r:
         :param value:
@@ -304,20 +1417,23 @@ class LazySegmentTreeAddSum:
         l += self._size
         r += self._size
         l0, r0 = l, r
+        # 代入は可換でないので、先に古い遅延を流しておく
+        self._eval(l0)
+        self._eval(r0 - 1)
         while l < r:
             if l & 1:
-                # 右側の子
-                self._add(l, value)
+                self._assign(l, value)
                 l += 1
             if r & 1:
-                # 左側の子
                 r -= 1
-                self._add(r, value)
+                self._assign(r, value)
             l >>= 1
             r >>= 1
         self._update(l0)
         self._update(r0 - 1)
 
+    apply = assign
+
     def get(self, l, r=None):
         """
         [l, r) の合計
@@ -326,22 +1442,408 @@ class LazySegmentTreeAddSum:
         """
         if r is None:
             r = l + 1
-        ret_l = []
-        ret_r = []
+        tree = self._tree
+        ret = 0
         l += self._size
         r += self._size
         self._eval(l)
         self._eval(r - 1)
         while l < r:
             if l & 1:
-                ret_l.append(self._tree[l])
+                ret += tree[l]
                 l += 1
             if r & 1:
                 r -= 1
-                ret_r.append(self._tree[r])
+                ret += tree[r]
             l >>= 1
             r >>= 1
-        return reduce(self._fn, ret_l + ret_r[::-1])
+        return ret
+
+
+class LazySegmentTreeMatrixSum:
+    # 区間に 2x2 行列を掛ける、区間のベクトル和
+    # https://atcoder.jp/contests/abc288/submissions/67592390
+    # http://codeforces.com/blog/entry/18051
+    def __init__(self, values, mod=998244353):
+        """
+        :param list of (int, int) values: 縦ベクトル (x, y) の列
+        :param int mod:
+        """
+        self._mod = mod
+        self._size = len(values)
+
+        # (x, y) の組の代わりに x と y を別の配列で持つ
+        xs = [0] * self._size * 2
+        ys = [0] * self._size * 2
+        for i, (x, y) in enumerate(values):
+            xs[self._size + i] = x % mod
+            ys[self._size + i] = y % mod
+        for i in reversed(range(1, self._size)):
+            xs[i] = (xs[i << 1] + xs[i << 1 | 1]) % mod
+            ys[i] = (ys[i << 1] + ys[i << 1 | 1]) % mod
+        self._xs = xs
+        self._ys = ys
+        # 遅延している行列 ((a, b), (c, d)) の各成分。恒等写像は単位行列
+        self._da = [1] * self._size * 2
+        self._db = [0] * self._size * 2
+        self._dc = [0] * self._size * 2
+        self._dd = [1] * self._size * 2
+
+    def _apply(self, p, a, b, c, d):
+        # p 以下の子どもたちに一様に行列を左から掛ける
+        # self._xs[p], self._ys[p] は遅延している行列を織り込み済み
+        mod = self._mod
+        x, y = self._xs[p], self._ys[p]
+        self._xs[p] = (a * x + b * y) % mod
+        self._ys[p] = (c * x + d * y) % mod
+        if p < self._size:
+            ga, gb, gc, gd = self._da[p], self._db[p], self._dc[p], self._dd[p]
+            self._da[p] = (a * ga + b * gc) % mod
+            self._db[p] = (a * gb + b * gd) % mod
+            self._dc[p] = (c * ga + d * gc) % mod
+            self._dd[p] = (c * gb + d * gd) % mod
+
+    def _update(self, p):
+        """
+        self._xs[p], self._ys[p] の親たちを最新化する
+        :param int p:
+        """
+        mod = self._mod
+        xs, ys = self._xs, self._ys
+        while p > 1:
+            p >>= 1
+            x = xs[p << 1] + xs[p << 1 | 1]
+            y = ys[p << 1] + ys[p << 1 | 1]
+            xs[p] = (self._da[p] * x + self._db[p] * y) % mod
+            ys[p] = (self._dc[p] * x + self._dd[p] * y) % mod
+
+    def _push(self, k):
+        """
+        遅延している行列を子どもたちに移す
+        :param int k:
+        """
+        a, b, c, d = self._da[k], self._db[k], self._dc[k], self._dd[k]
+        if a == 1 and b == 0 and c == 0 and d == 1:
+            return
+        self._apply(k << 1, a, b, c, d)
+        self._apply(k << 1 | 1, a, b, c, d)
+        self._da[k], self._db[k], self._dc[k], self._dd[k] = 1, 0, 0, 1
+
+    def _eval(self, p):
+        """
+        self._xs[p], self._ys[p] に遅延配列から値を移す
+        :param int p:
+        """
+        # root から葉に向かって遅延配列を移していく
+        for h in reversed(range(1, p.bit_length())):
+            self._push(p >> h)
+
+    def apply(self, l, r, matrix):
+        """
+        [l, r) の各ベクトルに左から matrix を掛ける
+        :param int l:
+        :param int r:
+        :param (int, int, int, int) matrix: ((a, b), (c, d)) を (a, b, c, d) で
+        """
+        a, b, c, d = matrix
+        l += self._size
+        r += self._size
+        l0, r0 = l, r
+        # 行列積は可換でないので、先に古い遅延を流しておく
+        self._eval(l0)
+        self._eval(r0 - 1)
+        while l < r:
+            if l & 1:
+                self._apply(l, a, b, c, d)
+                l += 1
+            if r & 1:
+                r -= 1
+                self._apply(r, a, b, c, d)
+            l >>= 1
+            r >>= 1
+        self._update(l0)
+        self._update(r0 - 1)
+
+    def get(self, l, r=None):
+        """
+        [l, r) のベクトルの和
+        :param int l:
+        :param int|None r:
+        :rtype: (int, int)
+        """
+        if r is None:
+            r = l + 1
+        xs, ys = self._xs, self._ys
+        x = y = 0
+        l += self._size
+        r += self._size
+        self._eval(l)
+        self._eval(r - 1)
+        while l < r:
+            if l & 1:
+                x += xs[l]
+                y += ys[l]
+                l += 1
+            if r & 1:
+                r -= 1
+                x += xs[r]
+                y += ys[r]
+            l >>= 1
+            r >>= 1
+        return x % self._mod, y % self._mod
+
+
+class SegmentTreeBeats:
+    # 区間 chmin、区間 chmax、区間 Add、区間 Sum、区間 Max、区間 Min
+    # 更新は償却 O(log^2 N)
+    # https://codeforces.com/blog/entry/57319
+    def __init__(self, values):
+        """
+        :param list values:
+        """
+        self._n = len(values)
+        size = 1
+        while size < self._n:
+            size <<= 1
+        self._size = size
+        inf = float("inf")
+        # 使ってない葉は -inf と inf にしておけば chmin、chmax で何もしない
+        self._max1 = [-inf] * size * 2
+        self._max2 = [-inf] * size * 2
+        self._maxc = [0] * size * 2
+        self._min1 = [inf] * size * 2
+        self._min2 = [inf] * size * 2
+        self._minc = [0] * size * 2
+        self._sum = [0] * size * 2
+        self._len = [0] * size * 2
+        self._lazy = [0] * size * 2
+        for i, v in enumerate(values):
+            k = size + i
+            self._max1[k] = self._min1[k] = self._sum[k] = v
+            self._maxc[k] = self._minc[k] = self._len[k] = 1
+        for k in reversed(range(1, size)):
+            self._len[k] = self._len[k << 1] + self._len[k << 1 | 1]
+            self._pull(k)
+
+    def _pull(self, k):
+        """
+        子どもたちから k を計算しなおす
+        :param int k:
+        """
+        max1, max2, maxc = self._max1, self._max2, self._maxc
+        min1, min2, minc = self._min1, self._min2, self._minc
+        a, b = k << 1, k << 1 | 1
+        self._sum[k] = self._sum[a] + self._sum[b]
+
+        if max1[a] > max1[b]:
+            max1[k], maxc[k] = max1[a], maxc[a]
+            max2[k] = max(max2[a], max1[b])
+        elif max1[a] < max1[b]:
+            max1[k], maxc[k] = max1[b], maxc[b]
+            max2[k] = max(max1[a], max2[b])
+        else:
+            max1[k], maxc[k] = max1[a], maxc[a] + maxc[b]
+            max2[k] = max(max2[a], max2[b])
+
+        if min1[a] < min1[b]:
+            min1[k], minc[k] = min1[a], minc[a]
+            min2[k] = min(min2[a], min1[b])
+        elif min1[a] > min1[b]:
+            min1[k], minc[k] = min1[b], minc[b]
+            min2[k] = min(min1[a], min2[b])
+        else:
+            min1[k], minc[k] = min1[a], minc[a] + minc[b]
+            min2[k] = min(min2[a], min2[b])
+
+    def _add(self, k, x):
+        # k 以下の子どもたちに一様に x を加算する
+        self._sum[k] += x * self._len[k]
+        self._max1[k] += x
+        self._max2[k] += x
+        self._min1[k] += x
+        self._min2[k] += x
+        self._lazy[k] += x
+
+    def _chmin(self, k, x):
+        # k の最大値だけを x にする; max2[k] < x < max1[k] であること
+        self._sum[k] += (x - self._max1[k]) * self._maxc[k]
+        if self._max1[k] == self._min1[k]:
+            self._max1[k] = self._min1[k] = x
+        elif self._max1[k] == self._min2[k]:
+            self._max1[k] = self._min2[k] = x
+        else:
+            self._max1[k] = x
+
+    def _chmax(self, k, x):
+        # k の最小値だけを x にする; max1[k] > x > min1[k] であること
+        self._sum[k] += (x - self._min1[k]) * self._minc[k]
+        if self._min1[k] == self._max1[k]:
+            self._min1[k] = self._max1[k] = x
+        elif self._min1[k] == self._max2[k]:
+            self._min1[k] = self._max2[k] = x
+        else:
+            self._min1[k] = x
+
+    def _push(self, k):
+        """
+        k の遅延を子どもたちに移す
+        :param int k:
+        """
+        for c in (k << 1, k << 1 | 1):
+            if self._lazy[k]:
+                self._add(c, self._lazy[k])
+            if self._max1[c] > self._max1[k]:
+                self._chmin(c, self._max1[k])
+            if self._min1[c] < self._min1[k]:
+                self._chmax(c, self._min1[k])
+        self._lazy[k] = 0
+
+    def _range(self, k):
+        """
+        ノード k が担当する区間
+        :param int k:
+        :rtype: (int, int)
+        """
+        depth = k.bit_length() - 1
+        width = self._size >> depth
+        lo = (k - (1 << depth)) * width
+        return lo, lo + width
+
+    def _apply(self, l, r, kind, x):
+        """
+        [l, r) に更新を適用する
+        :param int l:
+        :param int r:
+        :param int kind: 0: add, 1: chmin, 2: chmax
+        :param x:
+        """
+        size = self._size
+        stack = [1]
+        while stack:
+            k = stack.pop()
+            if k < 0:
+                # 帰りがけ
+                self._pull(~k)
+                continue
+            lo, hi = self._range(k)
+            if r <= lo or hi <= l:
+                continue
+            if kind == 1 and self._max1[k] <= x:
+                continue
+            if kind == 2 and self._min1[k] >= x:
+                continue
+            if l <= lo and hi <= r:
+                if kind == 0:
+                    self._add(k, x)
+                    continue
+                if kind == 1 and self._max2[k] < x:
+                    self._chmin(k, x)
+                    continue
+                if kind == 2 and self._min2[k] > x:
+                    self._chmax(k, x)
+                    continue
+            # 葉まで来たら必ず上のどれかで止まる
+            assert k < size
+            self._push(k)
+            stack.append(~k)
+            stack.append(k << 1 | 1)
+            stack.append(k << 1)
+
+    def add(self, l, r, x):
+        """
+        [l, r) に x を加算する
+        :param int l:
+        :param int r:
+        :param x:
+        """
+        self._apply(l, r, 0, x)
+
+    def chmin(self, l, r, x):
+        """
+        [l, r) の各値を min(値, x) にする
+        :param int l:
+        :param int r:
+        :param x:
+        """
+        self._apply(l, r, 1, x)
+
+    def chmax(self, l, r, x):
+        """
+        [l, r) の各値を max(値, x) にする
+        :param int l:
+        :param int r:
+        :param x:
+        """
+        self._apply(l, r, 2, x)
+
+    def _nodes(self, l, r):
+        """
+        [l, r) をちょうど覆うノード; 途中の遅延は全部移しておく
+        :param int l:
+        :param int r:
+        :rtype: list of int
+        """
+        ret = []
+        stack = [1]
+        while stack:
+            k = stack.pop()
+            lo, hi = self._range(k)
+            if r <= lo or hi <= l:
+                continue
+            if l <= lo and hi <= r:
+                ret.append(k)
+                continue
+            self._push(k)
+            stack.append(k << 1 | 1)
+            stack.append(k << 1)
+        return ret
+
+    def get_sum(self, l, r=None):
+        """
+        [l, r) の合計
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        return sum(self._sum[k] for k in self._nodes(l, r))
+
+    def get_max(self, l, r=None):
+        """
+        [l, r) の Max
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        return max(self._max1[k] for k in self._nodes(l, r))
+
+    def get_min(self, l, r=None):
+        """
+        [l, r) の Min
+        :param int l:
+        :param int|None r:
+        """
+        if r is None:
+            r = l + 1
+        return min(self._min1[k] for k in self._nodes(l, r))
+
+    def __len__(self):
+        return self._n
+
+
+# 遅延セグ木のレシピ
+# ac-library の LazySegTree に lambda を渡すと遅いので、op・mapping・composition を
+# 埋め込んだ専用クラスを使う
+# 値の更新は apply(l, r, f)、取得は get(l, r)
+LAZY_SEGMENT_TREES = {
+    "add_min": LazySegmentTreeAddMin,
+    "add_sum": LazySegmentTreeAddSum,
+    "chmax_max": LazySegmentTreeChmaxMax,
+    "assign_max": LazySegmentTreeAssignMax,
+    "assign_sum": LazySegmentTreeAssignSum,
+    "matrix_sum": LazySegmentTreeMatrixSum,
+}
 
 
 ## ac-library
@@ -350,6 +1852,7 @@ class LazySegmentTreeAddSum:
 ## composition(f, g): f ∘ g
 ## e: 単位元
 ## id: 恒等写像
+## よく使うものは LAZY_SEGMENT_TREES に専用クラスがある
 
 ## 区間 max、区間 chmax
 ## https://atcoder.jp/contests/abc382/submissions/61522085
@@ -442,9 +1945,10 @@ if __name__ == "__main__":
     assert st.get(0, 2) == 5
     assert st.get(1, 3) == 5
 
-    import numpy as np
     import itertools
 
+    import numpy as np
+
     values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8, 9]
 
     # Test LazySegmentTreeAddMin
@@ -470,3 +1974,247 @@ if __name__ == "__main__":
         st1.add(l, r, i * pow(-1, i))
         test[l:r] += i * pow(-1, i)
         i += 1
+
+    # Test max_right / min_left
+    import random
+
+    for n in range(1, 20):
+        values = [random.randint(0, 10) for _ in range(n)]
+        sts = [
+            SegmentTree(values, op=operator.add),
+            LazySegmentTreeAddSum(values),
+        ]
+        st2 = LazySegmentTreeAddMin(values)
+        for st in sts:
+            st.get(0, n)
+        for _ in range(30):
+            x = random.randint(0, 60)
+            l = random.randint(0, n)
+            r = l
+            while r < n and sum(values[l : r + 1]) <= x:
+                r += 1
+            for st in sts:
+                assert st.max_right(l, lambda v, x=x: v <= x) == r
+            r = random.randint(0, n)
+            l = r
+            while l > 0 and sum(values[l - 1 : r]) <= x:
+                l -= 1
+            for st in sts:
+                assert st.min_left(r, lambda v, x=x: v <= x) == l
+
+            y = random.randint(0, 10)
+            l = random.randint(0, n)
+            r = l
+            while r < n and min(values[l : r + 1]) >= y:
+                r += 1
+            assert st2.max_right(l, lambda v, y=y: v >= y) == r
+            r = random.randint(0, n)
+            l = r
+            while l > 0 and min(values[l - 1 : r]) >= y:
+                l -= 1
+            assert st2.min_left(r, lambda v, y=y: v >= y) == l
+
+            a = random.randint(0, n - 1)
+            b = random.randint(a + 1, n)
+            w = random.randint(0, 3)
+            sts[1].add(a, b, w)
+            st2.add(a, b, w)
+            for i in range(a, b):
+                values[i] += w
+            sts[0] = SegmentTree(values, op=operator.add)
+
+    # 非可換
+    s = "abracadabra"
+    st = SegmentTree(list(s), op=operator.add)
+    for l in range(len(s) + 1):
+        for r in range(l, len(s) + 1):
+            assert (
+                st.max_right(
+                    l, lambda v, l=l, r=r: s[l:r].startswith(v) and len(v) <= r - l
+                )
+                == r
+            )
+            assert (
+                st.min_left(
+                    r, lambda v, l=l, r=r: s[l:r].endswith(v) and len(v) <= r - l
+                )
+                == l
+            )
+
+    # Test get / set_many
+    for n in range(1, 20):
+        values = [random.randint(0, 10) for _ in range(n)]
+        st = SegmentTree([str(v) for v in values], op=operator.add, e="")
+        for _ in range(20):
+            k = random.randint(0, n)
+            indices = [random.randrange(n) for _ in range(k)]
+            news = [random.randint(0, 10) for _ in range(k)]
+            st.set_many(indices, [str(v) for v in news])
+            for i, v in zip(indices, news):
+                values[i] = v
+            for l in range(n + 1):
+                for r in range(l, n + 1):
+                    assert st.get(l, r) == "".join(map(str, values[l:r]))
+
+    # Test NumpySegmentTree
+    for op, fn in (("sum", sum), ("min", min), ("max", max)):
+        for n in range(1, 20):
+            values = np.random.randint(-100, 100, n)
+            st = NumpySegmentTree(values, op=op)
+            for _ in range(5):
+                indices = np.random.randint(0, n, np.random.randint(0, 4))
+                news = np.random.randint(-100, 100, len(indices))
+                st.set_many(indices, news)
+                values[indices] = news
+                i = np.random.randint(0, n)
+                st.set(i, n)
+                values[i] = n
+                ls, rs = zip(*itertools.combinations(range(n + 1), r=2))
+                expected = [fn(values[l:r]) for l, r in zip(ls, rs)]
+                assert st.get_many(ls, rs).tolist() == expected
+                assert [st.get(l, r) for l, r in zip(ls, rs)] == expected
+    st = NumpySegmentTree([1.5, 2.5, 0.5], op="min", dtype=np.float64)
+    assert st.get_many([0, 1, 0], [3, 2, 0]).tolist() == [0.5, 2.5, np.inf]
+    st = NumpySegmentTree([1, 2, 3, 7], op="xor")
+    assert st.get(1, 4) == 6
+
+    # Test LAZY_SEGMENT_TREES
+    MOD = 998244353
+    for n in range(1, 20):
+        values = [random.randint(-10, 10) for _ in range(n)]
+        sts = {
+            "chmax_max": LazySegmentTreeChmaxMax(values),
+            "assign_max": LazySegmentTreeAssignMax(values),
+            "assign_sum": LazySegmentTreeAssignSum(values),
+        }
+        tests = {name: values[:] for name in sts}
+        vectors = [(random.randrange(MOD), random.randrange(MOD)) for _ in range(n)]
+        st3 = LAZY_SEGMENT_TREES["matrix_sum"](vectors, MOD)
+        for _ in range(100):
+            l = random.randint(0, n - 1)
+            r = random.randint(l + 1, n)
+            v = random.randint(-10, 10)
+            for name, st in sts.items():
+                test = tests[name]
+                if name == "chmax_max":
+                    test[l:r] = [max(v, x) for x in test[l:r]]
+                else:
+                    test[l:r] = [v] * (r - l)
+                st.apply(l, r, v)
+            a, b, c, d = [random.randrange(MOD) for _ in range(4)]
+            st3.apply(l, r, (a, b, c, d))
+            for i in range(l, r):
+                x, y = vectors[i]
+                vectors[i] = ((a * x + b * y) % MOD, (c * x + d * y) % MOD)
+
+            l = random.randint(0, n - 1)
+            r = random.randint(l + 1, n)
+            assert sts["chmax_max"].get(l, r) == max(tests["chmax_max"][l:r])
+            assert sts["assign_max"].get(l, r) == max(tests["assign_max"][l:r])
+            assert sts["assign_sum"].get(l, r) == sum(tests["assign_sum"][l:r])
+            assert st3.get(l, r) == (
+                sum(x for x, _ in vectors[l:r]) % MOD,
+                sum(y for _, y in vectors[l:r]) % MOD,
+            )
+
+    # Test DynamicSegmentTree
+    for op, e in ((operator.add, 0), (min, float("inf")), (max, -float("inf"))):
+        for n in (1, 2, 5, 13, 32):
+            for lazy_add in (False, True):
+                st = DynamicSegmentTree(n, e, op=op, lazy_add=lazy_add)
+                test = [e] * n
+                for _ in range(100):
+                    l = random.randint(0, n - 1)
+                    r = random.randint(l + 1, n)
+                    v = random.randint(-10, 10)
+                    if lazy_add and random.random() < 0.5:
+                        st.range_add(l, r, v)
+                        for i in range(l, r):
+                            test[i] += v
+                    else:
+                        st.set(l, v)
+                        test[l] = v
+                    l = random.randint(0, n - 1)
+                    r = random.randint(l + 1, n)
+                    assert st.get(l, r) == reduce(op, test[l:r]), (op, n)
+                    assert st.get(l) == test[l]
+    st = DynamicSegmentTree(10**18, "", op=operator.add, max_nodes=200)
+    st.set(10**17, "b")
+    st.set(3, "a")
+    st.set(10**18 - 1, "c")
+    assert st.get(0, 10**18) == "abc"
+    assert st.get(4, 10**18) == "bc"
+    try:
+        for i in range(10):
+            st.set(i * 10**16, "x")
+        assert False
+    except MemoryError:
+        pass
+    # 失敗しても途中までの更新は壊れない
+    assert st._count <= 200
+    assert st.get(0, 10**18).count("x") == i
+    st2 = DynamicSegmentTree(10**9, 0, lazy_add=True, max_nodes=40)
+    st2.range_add(0, 10**9, 1)
+    try:
+        st2.range_add(1, 10**9 - 1, 1)
+        assert False
+    except MemoryError:
+        pass
+    assert st2._count <= 40
+    assert st2.get(0, 10**9) == 10**9
+    st.clear()
+    st.set(5, "z")
+    assert st.get(0, 10**18) == "z"
+
+    # Test PersistentSegmentTree
+    for n in range(1, 20):
+        versions = [[random.randint(0, 10) for _ in range(n)]]
+        st = PersistentSegmentTree(
+            [str(v) for v in versions[0]], op=operator.add, e="", max_updates=30
+        )
+        for _ in range(50):
+            ver = random.randrange(len(versions))
+            i = random.randrange(n)
+            v = random.randint(0, 10)
+            new_values = versions[ver][:]
+            new_values[i] = v
+            versions.append(new_values)
+            assert st.set(ver, i, str(v)) == len(versions) - 1
+            ver = random.randrange(len(versions))
+            l = random.randint(0, n)
+            r = random.randint(l, n)
+            assert st.get(ver, l, r) == "".join(map(str, versions[ver][l:r]))
+
+    # k 番目に小さい値
+    A = [random.randrange(10) for _ in range(30)]
+    st = PersistentSegmentTree([0] * 10)
+    for t, a in enumerate(A):
+        assert st.add(t, a, 1) == t + 1
+    for l in range(len(A)):
+        for r in range(l + 1, len(A) + 1):
+            for k in range(r - l):
+                assert st.kth(l, r, k) == sorted(A[l:r])[k]
+
+    # Test SegmentTreeBeats
+    for n in range(1, 20):
+        values = [random.randint(-10, 10) for _ in range(n)]
+        st = SegmentTreeBeats(values)
+        for _ in range(200):
+            l = random.randint(0, n - 1)
+            r = random.randint(l + 1, n)
+            x = random.randint(-10, 10)
+            kind = random.randrange(3)
+            if kind == 0:
+                st.add(l, r, x)
+                values[l:r] = [v + x for v in values[l:r]]
+            elif kind == 1:
+                st.chmin(l, r, x)
+                values[l:r] = [min(v, x) for v in values[l:r]]
+            else:
+                st.chmax(l, r, x)
+                values[l:r] = [max(v, x) for v in values[l:r]]
+            l = random.randint(0, n - 1)
+            r = random.randint(l + 1, n)
+            assert st.get_sum(l, r) == sum(values[l:r])
+            assert st.get_max(l, r) == max(values[l:r])
+            assert st.get_min(l, r) == min(values[l:r])
@@ -0,0 +1,276 @@
+import math
+from bisect import bisect_left, bisect_right
+
+
+class SortedMultiset:
+    """
+    平方分割したソート済みリスト
+    add, discard, index, [] などがならし O(√N)
+    https://github.com/tatyam-prime/SortedSet
+    """
+
+    def __init__(self, a=(), bucket_ratio=16, split_ratio=24):
+        """
+        ソート済みなら O(N)、そうでなければ O(N log N) で構築
+        :param collections.Iterable a:
+        :param int bucket_ratio: 構築時のバケットの大きさ; 1 バケットあたり √(N * bucket_ratio) 要素くらい
+        :param int split_ratio: バケットの大きさが (バケットの数) * split_ratio を超えたら分割する
+        """
+        self._bucket_ratio = bucket_ratio
+        self._split_ratio = split_ratio
+        a = list(a)
+        if any(a[i] > a[i + 1] for i in range(len(a) - 1)):
+            a.sort()
+        self._build(a)
+
+    def _build(self, a):
+        """
+        :param list a: ソート済みのリスト
+        """
+        n = self._size = len(a)
+        num_bucket = math.ceil(math.sqrt(n / self._bucket_ratio))
+        self._a = [
+            a[n * i // num_bucket : n * (i + 1) // num_bucket]
+            for i in range(num_bucket)
+        ]
+
+    def __iter__(self):
+        for a in self._a:
+            yield from a
+
+    def __reversed__(self):
+        for a in reversed(self._a):
+            yield from reversed(a)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)})"
+
+    def _position(self, x):
+        """
+        x を入れるならどこか
+        :return: (バケット, バケットの番号, バケット内のインデックス)
+        """
+        for i, a in enumerate(self._a):
+            if x <= a[-1]:
+                break
+        return a, i, bisect_left(a, x)
+
+    def __contains__(self, x):
+        if self._size == 0:
+            return False
+        a, _, i = self._position(x)
+        return i != len(a) and a[i] == x
+
+    def count(self, x):
+        """
+        x の個数
+        """
+        return self.index_right(x) - self.index(x)
+
+    def add(self, x):
+        """
+        x を追加する
+        """
+        if self._size == 0:
+            self._a = [[x]]
+            self._size = 1
+            return
+        a, b, i = self._position(x)
+        a.insert(i, x)
+        self._size += 1
+        if len(a) > len(self._a) * self._split_ratio:
+            mid = len(a) >> 1
+            self._a[b : b + 1] = [a[:mid], a[mid:]]
+
+    def _pop(self, a, b, i):
+        ret = a.pop(i)
+        self._size -= 1
+        if not a:
+            del self._a[b]
+        return ret
+
+    def discard(self, x):
+        """
+        x を 1 つ削除する
+        :return: 削除できたかどうか
+        :rtype: bool
+        """
+        if self._size == 0:
+            return False
+        a, b, i = self._position(x)
+        if i == len(a) or a[i] != x:
+            return False
+        self._pop(a, b, i)
+        return True
+
+    def lt(self, x):
+        """
+        x より小さい最大の要素。なければ None
+        """
+        for a in reversed(self._a):
+            if a[0] < x:
+                return a[bisect_left(a, x) - 1]
+
+    def le(self, x):
+        """
+        x 以下の最大の要素。なければ None
+        """
+        for a in reversed(self._a):
+            if a[0] <= x:
+                return a[bisect_right(a, x) - 1]
+
+    def gt(self, x):
+        """
+        x より大きい最小の要素。なければ None
+        """
+        for a in self._a:
+            if a[-1] > x:
+                return a[bisect_right(a, x)]
+
+    def ge(self, x):
+        """
+        x 以上の最小の要素。なければ None
+        """
+        for a in self._a:
+            if a[-1] >= x:
+                return a[bisect_left(a, x)]
+
+    def __getitem__(self, i):
+        """
+        i 番目 (0-indexed) に小さい要素
+        """
+        if i < 0:
+            for a in reversed(self._a):
+                i += len(a)
+                if i >= 0:
+                    return a[i]
+        else:
+            for a in self._a:
+                if i < len(a):
+                    return a[i]
+                i -= len(a)
+        raise IndexError
+
+    def pop(self, i=-1):
+        """
+        i 番目 (0-indexed) に小さい要素を削除して返す
+        """
+        if i < 0:
+            for b, a in enumerate(reversed(self._a)):
+                i += len(a)
+                if i >= 0:
+                    return self._pop(a, ~b, i)
+        else:
+            for b, a in enumerate(self._a):
+                if i < len(a):
+                    return self._pop(a, b, i)
+                i -= len(a)
+        raise IndexError
+
+    def index(self, x):
+        """
+        x より小さい要素の個数
+        """
+        ret = 0
+        for a in self._a:
+            if a[-1] >= x:
+                return ret + bisect_left(a, x)
+            ret += len(a)
+        return ret
+
+    def index_right(self, x):
+        """
+        x 以下の要素の個数
+        """
+        ret = 0
+        for a in self._a:
+            if a[-1] > x:
+                return ret + bisect_right(a, x)
+            ret += len(a)
+        return ret
+
+
+class SortedSet(SortedMultiset):
+    """
+    平方分割したソート済みリスト; 重複なし
+    https://github.com/tatyam-prime/SortedSet
+    """
+
+    def __init__(self, a=(), bucket_ratio=16, split_ratio=24):
+        """
+        ソート済みなら O(N)、そうでなければ O(N log N) で構築
+        :param collections.Iterable a:
+        :param int bucket_ratio:
+        :param int split_ratio:
+        """
+        a = list(a)
+        if any(a[i] >= a[i + 1] for i in range(len(a) - 1)):
+            a = sorted(set(a))
+        super().__init__(a, bucket_ratio, split_ratio)
+
+    def add(self, x):
+        """
+        x を追加する
+        :return: 追加できたかどうか
+        :rtype: bool
+        """
+        if self._size == 0:
+            self._a = [[x]]
+            self._size = 1
+            return True
+        a, b, i = self._position(x)
+        if i != len(a) and a[i] == x:
+            return False
+        a.insert(i, x)
+        self._size += 1
+        if len(a) > len(self._a) * self._split_ratio:
+            mid = len(a) >> 1
+            self._a[b : b + 1] = [a[:mid], a[mid:]]
+        return True
+
+
+if __name__ == "__main__":
+    import random
+    from bisect import insort
+
+    # Test SortedMultiset / SortedSet
+    for cls in (SortedMultiset, SortedSet):
+        for _ in range(100):
+            init = [random.randint(0, 30) for _ in range(random.randint(0, 30))]
+            ss = cls(init, bucket_ratio=1, split_ratio=2)
+            test = sorted(set(init)) if cls is SortedSet else sorted(init)
+            for _ in range(100):
+                x = random.randint(0, 30)
+                kind = random.randrange(3)
+                if kind == 0:
+                    added = ss.add(x)
+                    if cls is SortedSet:
+                        assert added == (x not in test)
+                        if added:
+                            insort(test, x)
+                    else:
+                        insort(test, x)
+                elif kind == 1:
+                    assert ss.discard(x) == (x in test)
+                    if x in test:
+                        test.remove(x)
+                elif test:
+                    i = random.randrange(-len(test), len(test))
+                    assert ss.pop(i) == test.pop(i)
+                assert list(ss) == test
+                assert list(reversed(ss)) == test[::-1]
+                assert len(ss) == len(test)
+                x = random.randint(-1, 31)
+                assert (x in ss) == (x in test)
+                assert ss.count(x) == test.count(x)
+                assert ss.index(x) == sum(v < x for v in test)
+                assert ss.index_right(x) == sum(v <= x for v in test)
+                assert ss.lt(x) == max((v for v in test if v < x), default=None)
+                assert ss.le(x) == max((v for v in test if v <= x), default=None)
+                assert ss.gt(x) == min((v for v in test if v > x), default=None)
+                assert ss.ge(x) == min((v for v in test if v >= x), default=None)
+                for i in range(-len(test), len(test)):
+                    assert ss[i] == test[i]
@@ -1,148 +1,752 @@
+import bisect
+import operator
+import sys
+
+
 class UnionFind:
-    def __init__(self, size=None, nodes=None):
+    def __init__(self, size=None, nodes=None, on_merge=None):
         """
         size か nodes どっちか指定。
-        nodes は set、size は list を使う。
+        nodes のときは内部で 0, 1, ... に振り直す。
         :param int size:
         :param collections.Iterable nodes:
+        :param callable on_merge: on_merge(大きい方の root, 小さい方の root)
+            併合するたびに呼ばれる。小さい方のデータを大きい方に移せば全体で O(N log N)
         """
         assert size is not None or nodes is not None
         if size is not None:
-            self._parents = [i for i in range(size)]
-            self._ranks = [0 for _ in range(size)]
-            self._sizes = [1 for _ in range(size)]
+            self._nodes = None
+            self._ids = None
         else:
-            self._parents = {k: k for k in nodes}
-            self._ranks = {k: 0 for k in nodes}
-            self._sizes = {k: 1 for k in nodes}
+            self._nodes = list(nodes)
+            self._ids = {k: i for i, k in enumerate(self._nodes)}
+            size = len(self._nodes)
+        # root なら -(木のノード数)、そうでなければ親
+        self._parents = [-1] * size
+        # 同じ木のノードを循環リストでつなぐ
+        self._next = list(range(size))
+        self._on_merge = on_merge
+
+    def _root(self, x):
+        p = self._parents
+        # 経路半減
+        while p[x] >= 0:
+            if p[p[x]] >= 0:
+                p[x] = p[p[x]]
+            x = p[x]
+        return x
 
     def unite(self, x, y):
         """
         x が属する木と y が属する木を併合
         :param x:
         :param y:
+        :return: 併合したかどうか
+        :rtype: bool
         """
-        x = self.root(x)
-        y = self.root(y)
+        if self._ids is not None:
+            x, y = self._ids[x], self._ids[y]
+        x = self._root(x)
+        y = self._root(y)
         if x == y:
-            return
+            return False
+        p = self._parents
+        # 小さい方が下
+        if p[x] > p[y]:
+            x, y = y, x
+        p[x] += p[y]
+        p[y] = x
+        # 循環リストをつなぎ替えて 1 つにする
+        nxt = self._next
+        nxt[x], nxt[y] = nxt[y], nxt[x]
+        if self._on_merge is not None:
+            if self._nodes is not None:
+                self._on_merge(self._nodes[x], self._nodes[y])
+            else:
+                self._on_merge(x, y)
+        return True
 
-        # rank が小さい方が下
-        if self._ranks[x] > self._ranks[y]:
-            # x が root
-            self._parents[y] = x
-            self._sizes[x] += self._sizes[y]
-        else:
-            # y が root
-            self._parents[x] = y
-            self._sizes[y] += self._sizes[x]
-            if self._ranks[x] == self._ranks[y]:
-                self._ranks[y] += 1
+    def unite_many(self, xs, ys):
+        """
+        各 j について xs[j] が属する木と ys[j] が属する木を併合
+        numpy 配列で渡されたら、ラベルの伝搬とポインタジャンプでまとめて併合する
+        :param xs:
+        :param ys:
+        """
+        # numpy が import されていなければ numpy 配列は来ないので numpy を読み込まない
+        np = sys.modules.get("numpy")
+        if (
+            self._ids is not None
+            or self._on_merge is not None
+            or np is None
+            or not isinstance(xs, np.ndarray)
+        ):
+            for x, y in zip(xs, ys):
+                self.unite(x, y)
+            return
+        label = self.roots()
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        while True:
+            lx = label[xs]
+            ly = label[ys]
+            diff = lx != ly
+            if not diff.any():
+                break
+            lo = np.minimum(lx[diff], ly[diff])
+            hi = np.maximum(lx[diff], ly[diff])
+            # 大きい方の root を小さい方につなげる; ラベルは親に行くほど小さいので閉路はできない
+            np.minimum.at(label, hi, lo)
+            while True:
+                nxt = label[label]
+                if np.array_equal(nxt, label):
+                    break
+                label = nxt
+        sizes = np.bincount(label, minlength=len(label))
+        parents = label.copy()
+        is_root = label == np.arange(len(label))
+        parents[is_root] = -sizes[is_root]
+        self._parents = parents.tolist()
+        # 同じ root のノードを順につないで、最後は先頭に戻す
+        order = np.argsort(label, kind="stable")
+        nxt = np.empty_like(order)
+        nxt[order] = np.roll(order, -1)
+        head = np.ones(len(order), dtype=bool)
+        head[1:] = label[order][1:] != label[order][:-1]
+        tail = np.roll(head, -1)
+        nxt[order[tail]] = order[head]
+        self._next = nxt.tolist()
 
     def root(self, x):
         """
         x が属する木の root
         :param x:
         """
-        if self._parents[x] == x:
-            return x
-        self._parents[x] = self.root(self._parents[x])
-        return self._parents[x]
+        if self._ids is not None:
+            return self._nodes[self._root(self._ids[x])]
+        return self._root(x)
 
     def size(self, x):
         """
         x が属する木のノード数
         :param x:
         """
-        return self._sizes[self.root(x)]
+        if self._ids is not None:
+            x = self._ids[x]
+        return -self._parents[self._root(x)]
+
+    def same(self, x, y):
+        """
+        x と y が同じ木に属するかどうか
+        :param x:
+        :param y:
+        """
+        return self.root(x) == self.root(y)
+
+    def members(self, x):
+        """
+        x と同じ木に属するノードのリスト
+        O(木のノード数)
+        :param x:
+        :rtype: list
+        """
+        if self._ids is not None:
+            x = self._ids[x]
+        nxt = self._next
+        ret = [x]
+        v = nxt[x]
+        while v != x:
+            ret.append(v)
+            v = nxt[v]
+        if self._nodes is not None:
+            ret = [self._nodes[i] for i in ret]
+        return ret
+
+    def roots(self):
+        """
+        各ノードの root の番号
+        ポインタジャンプでまとめて求める
+        :rtype: np.ndarray
+        """
+        import numpy as np
+
+        parents = np.array(self._parents, dtype=np.int64)
+        label = np.where(parents < 0, np.arange(len(parents)), parents)
+        while True:
+            nxt = label[label]
+            if np.array_equal(nxt, label):
+                return label
+            label = nxt
+
+    def groups(self):
+        """
+        連結成分ごとのノードのリスト
+        :rtype: list of list
+        """
+        import numpy as np
+
+        label = self.roots()
+        order = np.argsort(label, kind="stable")
+        bounds = np.flatnonzero(np.diff(label[order])) + 1
+        ret = [li.tolist() for li in np.split(order, bounds)] if len(order) else []
+        if self._nodes is not None:
+            ret = [[self._nodes[i] for i in li] for li in ret]
+        return ret
+
+
+class RollbackUnionFind:
+    """
+    巻き戻しできる UnionFind
+    経路圧縮しないので root は O(log N)
+    """
+
+    def __init__(self, size):
+        """
+        :param int size:
+        """
+        # root なら -(木のノード数)、そうでなければ親
+        self._parents = [-1] * size
+        # (x, parents[x], y, parents[y]) の変更履歴
+        self._hist = []
+        self._count = size
+
+    def root(self, x):
+        """
+        x が属する木の root
+        :param int x:
+        """
+        p = self._parents
+        while p[x] >= 0:
+            x = p[x]
+        return x
+
+    def unite(self, x, y):
+        """
+        x が属する木と y が属する木を併合
+        :param int x:
+        :param int y:
+        :return: 併合したかどうか
+        :rtype: bool
+        """
+        x = self.root(x)
+        y = self.root(y)
+        if x == y:
+            return False
+        p = self._parents
+        # 小さい方が下
+        if p[x] > p[y]:
+            x, y = y, x
+        self._hist.append((x, p[x], y, p[y]))
+        p[x] += p[y]
+        p[y] = x
+        self._count -= 1
+        return True
+
+    def size(self, x):
+        """
+        x が属する木のノード数
+        :param int x:
+        """
+        return -self._parents[self.root(x)]
+
+    def same(self, x, y):
+        """
+        x と y が同じ木に属するかどうか
+        :param int x:
+        :param int y:
+        """
+        return self.root(x) == self.root(y)
+
+    def count(self):
+        """
+        木の数
+        """
+        return self._count
+
+    def snapshot(self):
+        """
+        今の状態; rollback に渡すとここに戻る
+        :rtype: int
+        """
+        return len(self._hist)
+
+    def rollback(self, to):
+        """
+        snapshot() した時点まで戻す
+        :param int to:
+        """
+        p = self._parents
+        hist = self._hist
+        while len(hist) > to:
+            x, px, y, py = hist.pop()
+            p[x] = px
+            p[y] = py
+            self._count += 1
+
+
+def offline_dynamic_connectivity(N, events):
+    """
+    辺の追加・削除と連結判定のクエリをオフラインで処理する
+    各辺が生きている時間の区間をセグ木に載せて、DFS しながら RollbackUnionFind で併合・巻き戻しする
+    O(Q log Q log N)
+    :param int N: 頂点数
+    :param list of (int, int, int) events: (t, u, v)
+        t=0: 辺 (u, v) を追加、t=1: 辺 (u, v) を削除、t=2: u と v が連結かどうか
+    :return: t=2 のクエリの答えを順に
+    :rtype: list of bool
+    """
+    queries = []
+    # (u, v) -> 追加したときのクエリ番号のリスト
+    opened = {}
+    # (辺, 生きている間のクエリ番号の区間)
+    spans = []
+    for t, u, v in events:
+        if u > v:
+            u, v = v, u
+        if t == 0:
+            opened.setdefault((u, v), []).append(len(queries))
+        elif t == 1:
+            spans.append((u, v, opened[u, v].pop(), len(queries)))
+        else:
+            queries.append((u, v))
+    for (u, v), starts in opened.items():
+        for l in starts:
+            spans.append((u, v, l, len(queries)))
+
+    Q = len(queries)
+    if Q == 0:
+        return []
+    size = 1
+    while size < Q:
+        size <<= 1
+    # セグ木の各ノードに、その区間ずっと生きている辺を載せる
+    edges = [[] for _ in range(size * 2)]
+    for u, v, l, r in spans:
+        l += size
+        r += size
+        while l < r:
+            if l & 1:
+                edges[l].append((u, v))
+                l += 1
+            if r & 1:
+                r -= 1
+                edges[r].append((u, v))
+            l >>= 1
+            r >>= 1
+
+    uf = RollbackUnionFind(N)
+    ans = [False] * Q
+    # (ノード, 0) か 帰りがけの (-1, 巻き戻す先)
+    stack = [(1, 0)]
+    while stack:
+        k, snap = stack.pop()
+        if k < 0:
+            uf.rollback(snap)
+            continue
+        snap = uf.snapshot()
+        for u, v in edges[k]:
+            uf.unite(u, v)
+        if k >= size:
+            i = k - size
+            if i < Q:
+                u, v = queries[i]
+                ans[i] = uf.same(u, v)
+            uf.rollback(snap)
+            continue
+        stack.append((-1, snap))
+        stack.append((k << 1 | 1, 0))
+        stack.append((k << 1, 0))
+    return ans
+
+
+class PartiallyPersistentUnionFind:
+    """
+    部分永続 UnionFind
+    unite を t 回呼んだ時点の状態に対して root、連結判定、サイズを O(log N) で求める
+    経路圧縮しないで、親につないだ時刻を覚えておく
+    """
+
+    def __init__(self, size):
+        """
+        :param int size:
+        """
+        self._parents = list(range(size))
+        # 親につないだ時刻。root なら inf
+        self._times = [float("inf")] * size
+        # root ごとの (時刻, ノード数) の履歴
+        self._sizes = [[(0, 1)] for _ in range(size)]
+        # unite を呼んだ回数
+        self._now = 0
+
+    @property
+    def now(self):
+        return self._now
+
+    def root(self, x, t=None):
+        """
+        unite を t 回呼んだ時点で x が属する木の root
+        :param int x:
+        :param int|None t: None なら今
+        """
+        if t is None:
+            t = self._now
+        while self._times[x] <= t:
+            x = self._parents[x]
+        return x
+
+    def unite(self, x, y):
+        """
+        x が属する木と y が属する木を併合して、時刻を 1 進める
+        :param int x:
+        :param int y:
+        :return: 併合したかどうか
+        :rtype: bool
+        """
+        self._now += 1
+        x = self.root(x)
+        y = self.root(y)
+        if x == y:
+            return False
+        sx = self._sizes[x][-1][1]
+        sy = self._sizes[y][-1][1]
+        # 小さい方が下
+        if sx < sy:
+            x, y = y, x
+        self._parents[y] = x
+        self._times[y] = self._now
+        self._sizes[x].append((self._now, sx + sy))
+        return True
+
+    def connected_at(self, x, y, t):
+        """
+        unite を t 回呼んだ時点で x と y が連結かどうか
+        :param int x:
+        :param int y:
+        :param int t:
+        """
+        return self.root(x, t) == self.root(y, t)
+
+    def size_at(self, x, t):
+        """
+        unite を t 回呼んだ時点で x が属する木のノード数
+        :param int x:
+        :param int t:
+        """
+        hist = self._sizes[self.root(x, t)]
+        i = bisect.bisect_right(hist, (t, float("inf"))) - 1
+        return hist[i][1]
+
+    def first_time_connected(self, x, y):
+        """
+        x と y が連結になった最初の時刻; unite を何回呼んだら連結になったか
+        今も連結でなければ None
+        :param int x:
+        :param int y:
+        """
+        if x == y:
+            return 0
+        times = self._times
+        ret = 0
+        # つないだ時刻が早い方から親に上っていく; 最後に上った辺の時刻が答え
+        while x != y:
+            if times[x] < times[y]:
+                ret = times[x]
+                x = self._parents[x]
+            elif times[y] < float("inf"):
+                ret = times[y]
+                y = self._parents[y]
+            else:
+                return None
+        return ret
 
 
 class WeightedUnionFind:
-    def __init__(self, size=None, nodes=None):
+    """
+    重み付き UnionFind
+    重みは群 (op, inv, e) の元。デフォルトは整数の足し算
+    weight(x) = op(weight(親), (親からの重み)) で、root の重みは e
+    """
+
+    def __init__(self, size=None, nodes=None, op=operator.add, inv=operator.neg, e=0):
         """
         size か nodes どっちか指定。
-        nodes は set、size は list を使う。
+        nodes のときは内部で 0, 1, ... に振り直す。
         :param int size:
         :param collections.Iterable nodes:
+        :param callable op: 結合律を満たす二項演算
+        :param callable inv: 逆元
+        :param e: 単位元
         """
         assert size is not None or nodes is not None
         if size is not None:
-            self._parents = [i for i in range(size)]
-            self._ranks = [0 for _ in range(size)]
-            self._sizes = [1 for _ in range(size)]
-            # 直近の親からの重み。root なら 0
-            self._weights = [0 for _ in range(size)]
+            self._nodes = None
+            self._ids = None
         else:
-            self._parents = {k: k for k in nodes}
-            self._ranks = {k: 0 for k in nodes}
-            self._sizes = {k: 1 for k in nodes}
-            # 直近の親からの重み。root なら 0
-            self._weights = {k: 0 for k in nodes}
+            self._nodes = list(nodes)
+            self._ids = {k: i for i, k in enumerate(self._nodes)}
+            size = len(self._nodes)
+        self._op = op
+        self._inv = inv
+        self._e = e
+        # root なら -(木のノード数)、そうでなければ親
+        self._parents = [-1] * size
+        # 直近の親からの重み。root なら e
+        self._weights = [e] * size
+
+    def _root(self, x):
+        """
+        x が属する木の root; 経路圧縮して self._weights[x] を root からの重みにする
+        :param int x:
+        """
+        p = self._parents
+        w = self._weights
+        op = self._op
+        path = []
+        while p[x] >= 0:
+            path.append(x)
+            x = p[x]
+        # root に近い方から root に直接つなぎ直す
+        for v in reversed(path):
+            if p[v] != x:
+                w[v] = op(w[p[v]], w[v])
+                p[v] = x
+        return x
+
+    def _link(self, ry, x, y, d):
+        """
+        root の ry を x の root の子にする
+        weight(y) = op(weight(x), d) となるように ry の重みを決める
+        """
+        w = self._weights
+        self._weights[ry] = self._op(self._op(w[x], d), self._inv(w[y]))
+
+    def _diff(self, x, y):
+        """
+        同じ root に直接つながってる x, y について op(inv(weight(x)), weight(y))
+        """
+        return self._op(self._inv(self._weights[x]), self._weights[y])
 
     def unite(self, x, y, w):
         """
         x が属する木と y が属する木を併合
         :param x:
         :param y:
-        :param w: x と y の重みの差; (重み y) - (重み x)
+        :param w: x と y の重みの差; (重み y) = op(重み x, w)。足し算なら (重み y) - (重み x)
+        :return: 併合したかどうか
+        :rtype: bool
         """
-        rx = self.root(x)
-        ry = self.root(y)
+        if self._ids is not None:
+            x, y = self._ids[x], self._ids[y]
+        rx = self._root(x)
+        ry = self._root(y)
         if rx == ry:
-            return
-
-        # rank が小さい方が下
-        if self._ranks[rx] > self._ranks[ry]:
-            # x が root
-            self._parents[ry] = rx
-            self._sizes[rx] += self._sizes[ry]
-            # root 間の重みに変換
-            self._weights[ry] = w + self._weights[x] - self._weights[y]
-        else:
-            # y が root
-            self._parents[rx] = ry
-            self._sizes[ry] += self._sizes[rx]
-            # root 間の重みに変換
-            self._weights[rx] = -w + self._weights[y] - self._weights[x]
-            if self._ranks[rx] == self._ranks[ry]:
-                self._ranks[ry] += 1
+            return False
+        p = self._parents
+        # 小さい方が下
+        if p[rx] > p[ry]:
+            x, y, rx, ry, w = y, x, ry, rx, self._inv(w)
+        p[rx] += p[ry]
+        p[ry] = rx
+        self._link(ry, x, y, w)
+        return True
 
     def root(self, x):
         """
         x が属する木の root
         :param x:
         """
-        if self._parents[x] == x:
-            return x
-        root = self.root(self._parents[x])
-        self._weights[x] += self._weights[self._parents[x]]
-        self._parents[x] = root
-        return root
+        if self._ids is not None:
+            return self._nodes[self._root(self._ids[x])]
+        return self._root(x)
 
     def size(self, x):
         """
         x が属する木のノード数
         :param x:
         """
-        return self._sizes[self.root(x)]
+        if self._ids is not None:
+            x = self._ids[x]
+        return -self._parents[self._root(x)]
+
+    def same(self, x, y):
+        """
+        x と y が同じ木に属するかどうか
+        :param x:
+        :param y:
+        """
+        return self.root(x) == self.root(y)
 
     def weight(self, x):
         """
+        root から見た x の重み
         :param x:
         """
+        if self._ids is not None:
+            x = self._ids[x]
         # 経路圧縮
-        self.root(x)
+        self._root(x)
         return self._weights[x]
 
     def diff(self, x, y):
         """
-        (y の重み) - (x の重み)
+        (y の重み) - (x の重み); op(inv(x の重み), y の重み)
+        連結でなければ inf
         :param x:
         :param y:
         """
-        if self.root(x) == self.root(y):
-            return self._weights[y] - self._weights[x]
-        return float("inf")
+        if self._ids is not None:
+            x, y = self._ids[x], self._ids[y]
+        if self._root(x) != self._root(y):
+            return float("inf")
+        return self._diff(x, y)
+
+
+class XorWeightedUnionFind(WeightedUnionFind):
+    """
+    重みが xor の WeightedUnionFind
+    偶奇の制約などに
+    """
+
+    def __init__(self, size=None, nodes=None):
+        """
+        :param int size:
+        :param collections.Iterable nodes:
+        """
+        super().__init__(size, nodes, operator.xor, lambda w: w, 0)
+
+    def _root(self, x):
+        p = self._parents
+        w = self._weights
+        path = []
+        while p[x] >= 0:
+            path.append(x)
+            x = p[x]
+        for v in reversed(path):
+            if p[v] != x:
+                w[v] ^= w[p[v]]
+                p[v] = x
+        return x
+
+    def _link(self, ry, x, y, d):
+        self._weights[ry] = self._weights[x] ^ d ^ self._weights[y]
+
+    def _diff(self, x, y):
+        return self._weights[x] ^ self._weights[y]
+
+
+class ModWeightedUnionFind(WeightedUnionFind):
+    """
+    重みが mod M の足し算の WeightedUnionFind
+    """
+
+    def __init__(self, size=None, nodes=None, mod=998244353):
+        """
+        :param int size:
+        :param collections.Iterable nodes:
+        :param int mod:
+        """
+        self._mod = mod
+        super().__init__(size, nodes, lambda a, b: (a + b) % mod, lambda w: -w % mod, 0)
+
+    def _root(self, x):
+        p = self._parents
+        w = self._weights
+        mod = self._mod
+        path = []
+        while p[x] >= 0:
+            path.append(x)
+            x = p[x]
+        for v in reversed(path):
+            if p[v] != x:
+                w[v] = (w[v] + w[p[v]]) % mod
+                p[v] = x
+        return x
+
+    def _link(self, ry, x, y, d):
+        w = self._weights
+        w[ry] = (w[x] + d - w[y]) % self._mod
+
+    def _diff(self, x, y):
+        return (self._weights[y] - self._weights[x]) % self._mod
+
+
+class AffineWeightedUnionFind(WeightedUnionFind):
+    """
+    重みが mod M の 1 次関数 f(v) = av + b の WeightedUnionFind
+    unite(x, y, (a, b)) で (y の値) = a * (x の値) + b という制約を表す
+    weight(x) は (x の値) = a * (root の値) + b となる (a, b)
+    a は mod M で逆元があること
+    """
+
+    def __init__(self, size=None, nodes=None, mod=998244353):
+        """
+        :param int size:
+        :param collections.Iterable nodes:
+        :param int mod:
+        """
+        self._mod = mod
+        super().__init__(size, nodes, self._compose, self._inverse, (1, 0))
+        # (a, b) の組の代わりに a と b を別の配列で持つ
+        self._wa = [1] * len(self._parents)
+        self._wb = [0] * len(self._parents)
+        self._weights = None
+
+    def _compose(self, f, g):
+        """
+        f のあと g; (a2, b2)((a1, b1)(v)) = a2 * a1 * v + a2 * b1 + b2
+        """
+        a1, b1 = f
+        a2, b2 = g
+        return a2 * a1 % self._mod, (a2 * b1 + b2) % self._mod
+
+    def _inverse(self, f):
+        a, b = f
+        ia = pow(a, -1, self._mod)
+        return ia, -ia * b % self._mod
+
+    def _root(self, x):
+        p = self._parents
+        wa = self._wa
+        wb = self._wb
+        mod = self._mod
+        path = []
+        while p[x] >= 0:
+            path.append(x)
+            x = p[x]
+        for v in reversed(path):
+            u = p[v]
+            if u != x:
+                # v の値 = wa[v] * (u の値) + wb[v]、u の値 = wa[u] * (root の値) + wb[u]
+                wa[v], wb[v] = wa[v] * wa[u] % mod, (wa[v] * wb[u] + wb[v]) % mod
+                p[v] = x
+        return x
+
+    def _link(self, ry, x, y, d):
+        # y の値 = d(x の値) = d(wx(rx の値)) = wy(ry の値) なので ry の値 = wy^-1(d(wx(rx の値)))
+        mod = self._mod
+        da, db = d
+        a = da * self._wa[x] % mod
+        b = (da * self._wb[x] + db) % mod
+        ia = pow(self._wa[y], -1, mod)
+        self._wa[ry] = ia * a % mod
+        self._wb[ry] = ia * (b - self._wb[y]) % mod
+
+    def _diff(self, x, y):
+        # y の値 = wy(wx^-1(x の値))
+        mod = self._mod
+        ia, ib = self._inverse((self._wa[x], self._wb[x]))
+        return self._wa[y] * ia % mod, (self._wa[y] * ib + self._wb[y]) % mod
+
+    def weight(self, x):
+        """
+        (x の値) = a * (root の値) + b となる (a, b)
+        :param x:
+        :rtype: (int, int)
+        """
+        if self._ids is not None:
+            x = self._ids[x]
+        self._root(x)
+        return self._wa[x], self._wb[x]
 
 
 if __name__ == "__main__":
@@ -166,3 +770,164 @@ if __name__ == "__main__":
     uf2.unite("c", "e")
     assert uf2.root("a") == uf2.root("c")
     assert uf2.root("b") != uf2.root("e")
+
+    # Test unite_many / groups
+    import random
+
+    import numpy as np
+
+    for n in (1, 2, 10, 100):
+        for _ in range(20):
+            xs = np.random.randint(0, n, random.randint(0, 2 * n))
+            ys = np.random.randint(0, n, len(xs))
+            uf1 = UnionFind(size=n)
+            uf2 = UnionFind(size=n)
+            uf1.unite(0, n - 1)
+            uf2.unite(0, n - 1)
+            uf1.unite_many(xs, ys)
+            uf2.unite_many(xs.tolist(), ys.tolist())
+            assert sorted(uf1.groups()) == sorted(uf2.groups())
+            for v in range(n):
+                assert uf1.size(v) == uf2.size(v)
+                assert uf1.same(v, 0) == uf2.same(v, 0)
+            uf1.unite(0, n // 2)
+            uf2.unite(0, n // 2)
+            assert sorted(uf1.groups()) == sorted(uf2.groups())
+    uf3 = UnionFind(nodes="abcd")
+    uf3.unite_many("ab", "cd")
+    assert sorted(map(sorted, uf3.groups())) == [["a", "c"], ["b", "d"]]
+
+    # Test RollbackUnionFind / offline_dynamic_connectivity
+    uf = RollbackUnionFind(5)
+    uf.unite(0, 1)
+    s = uf.snapshot()
+    uf.unite(1, 2)
+    uf.unite(3, 4)
+    assert uf.same(0, 2) and uf.count() == 2
+    uf.rollback(s)
+    assert uf.same(0, 1) and not uf.same(0, 2) and not uf.same(3, 4)
+    assert uf.count() == 4 and uf.size(1) == 2
+
+    for _ in range(100):
+        n = random.randint(1, 8)
+        events = []
+        alive = []
+        expected = []
+        for _ in range(40):
+            t = random.randrange(3)
+            if t == 1 and not alive:
+                t = 0
+            if t == 0:
+                u, v = random.randrange(n), random.randrange(n)
+                alive.append((u, v))
+                events.append((0, u, v))
+            elif t == 1:
+                u, v = alive.pop(random.randrange(len(alive)))
+                events.append((1, v, u))
+            else:
+                u, v = random.randrange(n), random.randrange(n)
+                events.append((2, u, v))
+                uf = UnionFind(size=n)
+                for a, b in alive:
+                    uf.unite(a, b)
+                expected.append(uf.same(u, v))
+        assert offline_dynamic_connectivity(n, events) == expected
+
+    # Test PartiallyPersistentUnionFind
+    for _ in range(100):
+        n = random.randint(1, 10)
+        ppuf = PartiallyPersistentUnionFind(n)
+        edges = [(random.randrange(n), random.randrange(n)) for _ in range(15)]
+        ufs = []
+        for t in range(len(edges) + 1):
+            uf = UnionFind(size=n)
+            uf.unite_many([u for u, _ in edges[:t]], [v for _, v in edges[:t]])
+            ufs.append(uf)
+        for u, v in edges:
+            ppuf.unite(u, v)
+        for t, uf in enumerate(ufs):
+            for u in range(n):
+                assert ppuf.size_at(u, t) == uf.size(u)
+                for v in range(n):
+                    assert ppuf.connected_at(u, v, t) == uf.same(u, v)
+        for u in range(n):
+            for v in range(n):
+                first = next((t for t, uf in enumerate(ufs) if uf.same(u, v)), None)
+                assert ppuf.first_time_connected(u, v) == first
+
+    # Test WeightedUnionFind
+    for _ in range(100):
+        n = random.randint(1, 10)
+        values = [random.randrange(100) for _ in range(n)]
+        wuf = WeightedUnionFind(nodes=[chr(ord("a") + i) for i in range(n)])
+        xuf = XorWeightedUnionFind(size=n)
+        muf = ModWeightedUnionFind(size=n, mod=7)
+        for _ in range(15):
+            u, v = random.randrange(n), random.randrange(n)
+            cu, cv = chr(ord("a") + u), chr(ord("a") + v)
+            wuf.unite(cu, cv, values[v] - values[u])
+            xuf.unite(u, v, values[u] ^ values[v])
+            muf.unite(u, v, (values[v] - values[u]) % 7)
+            for x in range(n):
+                for y in range(n):
+                    cx, cy = chr(ord("a") + x), chr(ord("a") + y)
+                    if wuf.same(cx, cy):
+                        assert wuf.diff(cx, cy) == values[y] - values[x]
+                        assert xuf.diff(x, y) == values[x] ^ values[y]
+                        assert muf.diff(x, y) == (values[y] - values[x]) % 7
+                    else:
+                        assert wuf.diff(cx, cy) == float("inf")
+                        assert xuf.diff(x, y) == float("inf")
+                    assert wuf.size(cx) == xuf.size(x) == muf.size(x)
+
+    # Test AffineWeightedUnionFind
+    mod = 998244353
+    for _ in range(100):
+        n = random.randint(1, 10)
+        values = [random.randrange(mod) for _ in range(n)]
+        auf = AffineWeightedUnionFind(size=n, mod=mod)
+        for _ in range(15):
+            u, v = random.randrange(n), random.randrange(n)
+            a = random.randrange(1, mod)
+            b = (values[v] - a * values[u]) % mod
+            auf.unite(u, v, (a, b))
+            for x in range(n):
+                for y in range(n):
+                    if auf.same(x, y):
+                        a, b = auf.diff(x, y)
+                        assert (a * values[x] + b) % mod == values[y]
+            for x in range(n):
+                a, b = auf.weight(x)
+                assert (a * values[auf.root(x)] + b) % mod == values[x]
+
+    # Test UnionFind.members / on_merge
+    for _ in range(100):
+        n = random.randint(1, 10)
+        data = [{i} for i in range(n)]
+        merged = []
+
+        def on_merge(big, small, data=data, merged=merged):
+            merged.append((len(data[big]), len(data[small])))
+            data[big] |= data[small]
+            data[small] = None
+
+        uf = UnionFind(size=n, on_merge=on_merge)
+        nuf = UnionFind(nodes=range(n))
+        for _ in range(8):
+            u, v = random.randrange(n), random.randrange(n)
+            uf.unite(u, v)
+            nuf.unite_many(np.array([u]), np.array([v]))
+            for x in range(n):
+                assert sorted(uf.members(x)) == sorted(nuf.members(x))
+                assert set(uf.members(x)) == data[uf.root(x)]
+                assert len(uf.members(x)) == uf.size(x)
+        assert all(b >= s for b, s in merged)
+        uf2 = UnionFind(size=n)
+        uf2.unite_many(
+            np.random.randint(0, n, size=5, dtype=np.int64),
+            np.random.randint(0, n, size=5, dtype=np.int64),
+        )
+        for x in range(n):
+            members = uf2.members(x)
+            assert len(members) == len(set(members)) == uf2.size(x)
+            assert all(uf2.same(x, y) for y in members)